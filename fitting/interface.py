@@ -4,10 +4,12 @@
 # -*- coding: utf-8 -*-
 import copy
 import corner
+import math
 # import sys
 import warnings
 import numpy as np
 import matplotlib.pyplot as plt
+from operator import attrgetter
 from scipy import stats
 
 from pyterpol3.synthetic.makespectrum import SyntheticGrid
@@ -15,17 +17,31 @@ from pyterpol3.observed.observations import ObservedSpectrum
 from pyterpol3.fitting.parameter import Parameter
 from pyterpol3.fitting.parameter import parameter_definitions
 from pyterpol3.fitting.fitter import Fitter
-from pyterpol3.synthetic.auxiliary import generate_least_number
 from pyterpol3.synthetic.auxiliary import keys_to_lowercase
 from pyterpol3.synthetic.auxiliary import read_text_file
 from pyterpol3.synthetic.auxiliary import string2bool
 from pyterpol3.synthetic.auxiliary import sum_dict_keys
+from pyterpol3.synthetic.auxiliary import write_numpy
 from pyterpol3.synthetic.auxiliary import ZERO_TOLERANCE
 from pyterpol3.plotting.plotting import *
 
 # repeat userwarnings
 warnings.simplefilter('always', UserWarning)
 
+# attributes of parameters listed in StarList files,
+# format of one line and types of the attributes -
+# the remaining ones are strings
+_STARLIST_KEYS = ('value', 'unit', 'fitted', 'vmin', 'vmax', 'group')
+_STARLIST_LINE = 'component: %s parameter: %s ' + ''.join(['%s: %%s ' % key for key in _STARLIST_KEYS]) + '\n'
+_STARLIST_TYPES = dict(value=float, vmin=float, vmax=float, group=int, fitted=string2bool)
+
+# types of region parameters in RegionList files,
+# the remaining ones are groups
+_REGIONLIST_TYPES = dict(wmin=float, wmax=float, identification=str, component=str)
+
+# types of enviromental keys of StarList and RegionList
+_ENV_TYPES = dict(debug=string2bool)
+
 class Interface(object):
     """
     """
@@ -88,6 +104,10 @@ class Interface(object):
         self.ident_fitted_pars = None
         self.one4all = False
 
+        # fitted parameters do not change during
+        # the fitting, so they are listed only once
+        self._running_fitpars = None
+
     def __str__(self):
         """
         String representation of the class
@@ -160,6 +180,7 @@ class Interface(object):
                                             observed=observed,
                                             groups=groups,
                                             synthetic={x: None for x in list(parameters.keys())},
+                                            synthetic_sum=None,
                                             chi2=0.0,
                                             wmin=wmin,
                                             wmax=wmax,
@@ -415,10 +436,7 @@ class Interface(object):
             c = log['component'][i]
             g = log['group'][i]
 
-            if c not in list(errors.keys()):
-                errors[c] = {}
-            if p not in list(errors[c].keys()):
-                errors[c][p] = []
+            errors.setdefault(c, {}).setdefault(p, [])
 
             # get the error estimate
             best = log['data'][minind, i]
@@ -747,18 +765,22 @@ class Interface(object):
                                                                                   korel=korelmode,
                                                                                   **pars)
 
+            # sum component spectra - the sum is
+            # kept for writing and plotting
+            for i, c in enumerate(rec['synthetic'].keys()):
+                if i == 0:
+                    syn = rec['synthetic'][c].copy()
+                else:
+                    syn += rec['synthetic'][c]
+            rec['synthetic_sum'] = syn
+
             # it is mandatory to provide errors for
             # computation of the chi2
             if error is not None:
-                # sum component spectra
-                for i, c in enumerate(rec['synthetic'].keys()):
-                    if i == 0:
-                        syn = rec['synthetic'][c].copy()
-                    else:
-                        syn = syn + rec['synthetic'][c]
-
-                # setup the chi2
-                rec['chi2'] = np.sum(((intens - syn) / error) ** 2)
+                # setup the chi2 - dot product of the weighted
+                # residuals avoids the temporary squared array
+                resid = (intens - syn) / error
+                rec['chi2'] = np.dot(resid, resid)
 
     def optimize_rv(self, fitter_name=None, groups=None, **fitter_kwargs):
         """
@@ -831,7 +853,9 @@ class Interface(object):
         # merge the spectra
         if any([cpr['synthetic'][key] is None for key in list(cpr['synthetic'].keys())]):
             raise ValueError('The synthetic spectra are not computed. Did you run Interface.populate_comparisons()?')
-        si = sum_dict_keys(cpr['synthetic'])
+        si = cpr['synthetic_sum']
+        if si is None:
+            si = sum_dict_keys(cpr['synthetic'])
 
         # names
         if cpr['observed'] is not None:
@@ -1161,7 +1185,10 @@ class Interface(object):
         # parameters are passed by reference, so
         # this should also change the starlist
         # and corresponding
-        fitpars = self.sl.get_fitted_parameters()
+        if self._running_fitpars is not None:
+            fitpars = self._running_fitpars
+        else:
+            fitpars = self.sl.get_fitted_parameters()
         if len(pars) != len(fitpars):
             raise ValueError('Length of the vector passed with the fitting environment does '
                              'mot match length of the parameters marked as fitted.')
@@ -1175,7 +1202,7 @@ class Interface(object):
         # the grid parameters are fitted
         components_to_update = []
 
-        for c in list(self.sl.fitted_types.keys()):
+        for c in self.sl.fitted_types:
             for rec in self.sl.fitted_types[c]:
 
                 # recompute only those components for those
@@ -1268,21 +1295,16 @@ class Interface(object):
         if l is None:
             l = self.comparisonList
 
-        chi2 = 0.0
-        if verbose:
-            chi2_detailed = []
+        # read out the chi squares - the reduction over
+        # the residuals was already done per comparison
+        chi2 = sum([rec['chi2'] for rec in l], 0.0)
 
-        # read out the chi squares
-        for i in range(0, len(l)):
-            chi2 += l[i]['chi2']
-
-            # if verbosity is desired a detailed chi-square
-            # info on each region is returned
-            if verbose:
-                chi2_detailed.append(dict(chi2=l[i]['chi2'],
-                                     region=self.rl.mainList[l[i]['region']],
-                                     rv_group=l[i]['groups']['rv']))
+        # if verbosity is desired a detailed chi-square
+        # info on each region is returned
         if verbose:
+            chi2_detailed = [dict(chi2=rec['chi2'],
+                                  region=self.rl.mainList[rec['region']],
+                                  rv_group=rec['groups']['rv']) for rec in l]
             return chi2, chi2_detailed
         else:
             return chi2
@@ -1504,22 +1526,28 @@ class Interface(object):
         self.update_fitter()
 
         # set the identification of fitted parameters
-        self.fitter.set_fit_properties(self.sl.get_fitted_parameters(True)[1])
+        fitpars, fitpars_info = self.sl.get_fitted_parameters(True)
+        self.fitter.set_fit_properties(fitpars_info)
+        self._running_fitpars = fitpars
 
         # this starts recording of each iteration chi2
         self.fit_is_running = True
 
-        # runs the fitting
-        self.fitter(self.compute_chi2, l, verbose)
+        try:
+            # runs the fitting
+            self.fitter(self.compute_chi2, l, verbose)
 
-        # copy the fit into the whole structure
-        self.accept_fit()
+            # copy the fit into the whole structure
+            self.accept_fit()
 
-        # writes the remaining iterations within the file
-        self.fitter.flush_iters()
+            # writes the remaining iterations within the file
+            self.fitter.flush_iters()
 
-        # turn of the fitting
-        self.fit_is_running = False
+        # turn of the fitting, also when it
+        # failed or was interrupted
+        finally:
+            self.fit_is_running = False
+            self._running_fitpars = None
 
     def run_bootstrap(self, limits, outputname=None, decouple_rv=True, niter=100, sub_niter=3):
         """
@@ -1583,9 +1611,9 @@ class Interface(object):
 
             # get list of fitted parameters      
             fitpars = {}
-            for c in list(itf.sl.componentList.keys()):
+            for c in itf.sl.componentList:
                 fitpars[c] = []
-                for p in list(itf.sl.componentList[c].keys()):
+                for p in itf.sl.componentList[c]:
                     for k in range(0, len(itf.sl.componentList[c][p])):
                         if itf.sl.componentList[c][p][k].fitted:
                             fitpars[c].append(p)
@@ -1749,14 +1777,7 @@ class Interface(object):
 
             if self.spectrum_by_spectrum is not None:
                 # setup groups for each spectrum
-                # relative luminosity is given by spectra region, not the spectrum itself
-                phys_pars = [par for par in self.sl.get_physical_parameters() if par not in 'lr']
-
-                # parameters that will be owned by each spectrum
-                varparams = self.spectrum_by_spectrum
-
-                # common parameters
-                fixparams = [par for par in phys_pars if par not in self.spectrum_by_spectrum]
+                varparams, fixparams = self._get_varfix_parameters()
                 self._set_groups_to_observed(varparams, fixparams)
                 self._setup_all_groups()
             else:
@@ -1825,6 +1846,23 @@ class Interface(object):
                                   str(list(self._grid_kwargs.keys())),
                                   str(self._synthetic_spectrum_kwargs)))
 
+    def _get_varfix_parameters(self):
+        """
+        Splits the physical parameters into those owned by
+        each spectrum and those common to all spectra.
+        :return: varparams, fixparams
+        """
+        # relative luminosity is given by spectra region, not the spectrum itself
+        phys_pars = [par for par in self.sl.get_physical_parameters() if par not in 'lr']
+
+        # parameters that will be owned by each spectrum
+        varparams = list(self.spectrum_by_spectrum)
+
+        # common parameters
+        fixparams = [par for par in phys_pars if par not in varparams]
+
+        return varparams, fixparams
+
     def _set_groups_to_observed(self, varparams, fixparams):
         """
         :param varparams parameters whose group number should vary from spectrum to spectrum
@@ -1929,7 +1967,7 @@ class Interface(object):
         # get all fitted parameters
         parname = parname.lower()
         for c in components:
-            if parname in list(self.sl.componentList[c].keys()):
+            if parname in self.sl.componentList[c]:
                 for p in self.sl.componentList[c][parname]:
                     v = p['value']
 
@@ -1984,6 +2022,12 @@ class Interface(object):
         # belongs to which spectrum
         new_groups = dict()
 
+        # groups already defined for all components - the set
+        # only grows by the groups cloned below, so the least
+        # free number never decreases
+        def_groups = set(self.sl.get_defined_groups(component='all', parameter='rv')['all']['rv'])
+        free_gn = 0
+
         # get wavelength boundaries of defined regions
         wmins, wmaxs, regs = self.rl.get_wavelengths(verbose=True)
 
@@ -2010,18 +2054,15 @@ class Interface(object):
                     rv_groups = [rv_groups]
 
                 for rv_group in rv_groups:
-                    # readout groups that were already defined for all components
-                    def_groups = self.sl.get_defined_groups(component='all', parameter='rv')['all']['rv']
-
                     # We define group for our observation
                     if rv_group is None:
-                        gn = generate_least_number(def_groups)
+                        while free_gn in def_groups:
+                            free_gn += 1
+                        gn = free_gn
                         reg2rv[reg].append(gn)
 
                         # save the newly registered group
-                        if spectrum.filename not in list(new_groups.keys()):
-                            new_groups[spectrum.filename] = []
-                        new_groups[spectrum.filename].append(gn)
+                        new_groups.setdefault(spectrum.filename, []).append(gn)
 
                     elif rv_group not in def_groups:
                         gn = rv_group
@@ -2038,6 +2079,7 @@ class Interface(object):
                     # attachs new parameter to the StarList
                     # print component, gn
                     self.sl.clone_parameter(component, 'rv', group=gn)
+                    def_groups.add(gn)
 
                     if component not in cloned_comps:
                         if component == 'all':
@@ -2086,6 +2128,12 @@ class Interface(object):
             cloned_comps = []
             registered_groups = []
 
+            # groups already defined for all components - the set
+            # only grows by the groups cloned below, so the least
+            # free number never decreases
+            def_groups = set(self.sl.get_defined_groups(component='all', parameter=p_par)['all'][p_par])
+            free_gn = 0
+
             for wmin, wmax, reg in zip(wmins, wmaxs, regs):
 
                 # query spectra for each region
@@ -2105,14 +2153,12 @@ class Interface(object):
                         # self.ol.set_spectrum(spectrum.filename, group={p_par:0})
                         p_group = None
 
-                    # readout groups that were already defined for all components
-                    def_groups = self.sl.get_defined_groups(component='all', parameter=p_par)['all'][p_par]
-                    # print p_par, def_groups
-
                     # We define group for our observation
                     if p_group is None:
                         if p_par == 'rv':
-                            gn = generate_least_number(def_groups)
+                            while free_gn in def_groups:
+                                free_gn += 1
+                            gn = free_gn
                             reg2rv[reg].append(gn)
                         # for other than rvs, the default group is 0
                         else:
@@ -2121,9 +2167,7 @@ class Interface(object):
                             continue
 
                         # save the newly registered group
-                        if spectrum.filename not in list(new_groups.keys()):
-                            new_groups[spectrum.filename] = []
-                        new_groups[spectrum.filename].append(gn)
+                        new_groups.setdefault(spectrum.filename, []).append(gn)
 
                     elif p_group not in def_groups:
                         gn = p_group
@@ -2140,6 +2184,7 @@ class Interface(object):
                     # attachs new parameter to the StarList
                     # print component, gn
                     self.sl.clone_parameter(component, p_par, group=gn)
+                    def_groups.add(gn)
 
                     if component not in cloned_comps:
                         if component == 'all':
@@ -2267,19 +2312,16 @@ class Interface(object):
             # get all observed spectra corresponding to the group
             obspecs = self.ol.get_spectra(rv=g)
 
-            # get the radial velocities
+            # get the radial velocities - they are the same for
+            # all spectra in the group
+            # if an component is missing -9999.999 is assigned instead
             pars = self.sl.get_parameter(rv=g)
+            group_rvs = [pars[c][0]['value'] if pars.get(c) else -9999.9999 for c in components]
 
             for obspec in obspecs:
-                for j, c in enumerate(components):
-
-                    # append radial velocity
-                    if c in list(pars.keys()):
-                        rvs[c].append(pars[c][0]['value'])
-
-                    # if an component is missing -9999.999 is assigned instead
-                    else:
-                        rvs[c].append(-9999.9999)
+                # append radial velocity
+                for c, rv in zip(components, group_rvs):
+                    rvs[c].append(rv)
 
                 # append name and hjd and group
                 names.append(obspec.filename)
@@ -2343,19 +2385,15 @@ class Interface(object):
         # get all components for a given group
         rps = {p: {c: [] for c in components} for p in parlist} # radiative parameters
         names = []
-        hjds = []
-        groups = []
 
         gap = 3
 
-        # get the first observed spectra corresponding to the group, since the radiative parameters are calculated for all input spectra and it does not matter which radiative parameters are requested
-        obspecs = self.ol.get_spectra(rv=allgroups[0])
-
+        # the radiative parameters are calculated for all input spectra,
+        # so it does not matter which radiative parameters are requested
         pars = self.sl.get_parameter(rv=allgroups[0])
-        cpr = self.comparisonList[0]
 
         # get the radiative transfer parameters
-        for i, c in enumerate(components):
+        for c in components:
             for p in parlist:
                  if c in list(pars.keys()):
                        rps[p][c].append(self.extract_parameters(cpr['parameters'][c])[p])
@@ -2364,156 +2402,28 @@ class Interface(object):
                  # if an component is missing -9999.999 is assigned instead
 
         if outputname is not None:
-            # opent the file
-            ofile = open(outputname, 'w')
-
-            # switch for writing hjds
-            has_hjd = any([x is not None for x in hjds])
+            # rvs are different for every spectrum and are printed into a table with write_rvs
+            cols = [(p, c) for p in parlist for c in components if p != 'rv']
+            colnames = [(str(p) + '_' + str(c)).upper() for p, c in cols]
+            values = [str(rps[p][c][0]).upper() for p, c in cols]
 
-            # write the header
-            first = True
-            ofile.write('#')
-            for p in parlist:
-                for c in components:
-                    if p != 'rv': # rvs are different for every spectrum and are printed into a table with write_rvs
-                        if first:
-                            gap = gap -1 # to compensate the # at the beginning of the header
-                        parcomp = str(p) + '_' + str(c)
-                        parcomp_len = len(parcomp)
-                        parcomp_val_len = len(str(rps[p][c][0]))
-                        if parcomp_val_len > parcomp_len:
-                            str_len = "%"+ str(parcomp_val_len + gap)  +"s"
-                        else:
-                            str_len = "%"+ str(parcomp_len + gap)  +"s"
-                        ofile.write(str_len % parcomp.upper()) # S
-                        if first:
-                            gap = gap +1
-                            first = False
-            ofile.write('\n')
+            # the formats are set up once - the first column of
+            # the header compensates the # at its beginning
+            widths = [max(len(name), len(val)) + gap for name, val in zip(colnames, values)]
+            header_fmt = '#' + ''.join(['%%%ds' % (w - (i == 0)) for i, w in enumerate(widths)]) + '\n'
+            row_fmt = ''.join(['%%%ds' % w for w in widths]) + '\n'
 
-            # write the radiative parameters
-            for p in parlist:
-                for c in components:
-                      if p != 'rv':
-                            parcomp_val = str(rps[p][c][0])
-                            parcomp = str(p) + '_' + str(c)
-                            parcomp_len = len(parcomp)
-                            parcomp_val_len = len(str(rps[p][c][0]))
-                            print((rps[p][c][0]))
-                            if parcomp_val_len > parcomp_len:
-                                str_len = "%"+ str(parcomp_val_len + gap)  +"s"
-                            else:
-                                str_len = "%"+ str(parcomp_len + gap)  +"s"
-                            ofile.write(str_len % parcomp_val.upper()) # S
-            ofile.write('\n')
+            # write the header and the radiative parameters
+            with open(outputname, 'w') as ofile:
+                ofile.write(header_fmt % tuple(colnames) + row_fmt % tuple(values))
 
         return rps, allgroups, names
 
-
-#    def write_values(self, outputname=None):
-#
-#        # get define groups
-#        groups = self.get_defined_groups(component='all', parameter='rv')
-#
-#        # get a parameter
-#        components = self.sl._registered_components
-#
-#        # get a list of unique groups
-#        allgroups = []
-#        for c in components:
-#            allgroups.extend(groups[c]['rv'])
-#        allgroups =  np.unique(allgroups)
-#
-#        # Keys
-#        cpr = self.comparisonList[0]
-#        parlist = self.extract_parameters(cpr['parameters']['prim']).keys()
-#
-#        # get all components for a given group
-#        values = {p: {c: [] for c in components} for p in parlist}
-#        names = []
-#        hjds = []
-#        groups = []
-#
-#        for i, g in enumerate(allgroups):
-#
-#            # get all observed spectra corresponding to the group
-#            obspecs = self.ol.get_spectra(rv=g)
-#
-#            # get the radial velocities
-#            pars = self.sl.get_parameter(rv=g)
-#            cpr = self.comparisonList[i]
-#
-#            for obspec in obspecs:
-#                for j, c in enumerate(components):
-#                    print(j,c)
-#                    for p in parlist:
-#                        if c in pars.keys():
-#                            values[p][c].append(self.extract_parameters(cpr['parameters'][c])[p])
-#                        else:
-#                            values[p][c].append(-9999.9999)
-#                    # if an component is missing -9999.999 is assigned instead
-#                # append name and hjd and group
-#                names.append(obspec.filename)
-#                hjds.append(obspec.hjd)
-#                groups.append(g)
-#            print(values)
-#
-#        if outputname is not None:
-#            # opent the file
-#            ofile = open(outputname, 'w')
-#
-#            # switch for writing hjds
-#            has_hjd = any([x is not None for x in hjds])
-#
-#            # write the header
-#            if has_hjd: # S
-#                ofile.write("#%9s" % ('HJD')) # S
-#            else:
-#                ofile.write("#") # S
-#            for p in parlist:
-#                for c in components:
-#                    parcomp = str(p) + '_' + str(c)
-#                    parcomp_len = len(parcomp)
-#                    parcomp_val_len = len(str(values[p][c][0]))
-#                    if parcomp_val_len > parcomp_len:
-#                        str_len = "%"+ str(parcomp_val_len + 3)  +"s"
-#                    else:
-#                        str_len = "%"+ str(parcomp_len + 3)  +"s"
-#                    if p == 'rv':
-#                        str_len = "%14s"
-#                    ofile.write(str_len % parcomp.upper()) # S
-#            ofile.write("%8s%15s" % ('GROUP', 'FILENAME')) # S
-#            ofile.write('\n')
-#
-#            for i in range(0, len(names)):
-#
-#                if has_hjd:
-#                    ofile.write("%10s" % (str(hjds[i])))
-#                #for c in components:
-#                    #ofile.write("%15.6f" % rvs[c][i])
-#                    for p in parlist:
-#                        #for c in pars.keys():
-#                        for c in components:
-#                            parcomp_val = str(values[p][c][i])
-#                            #parcomp_val_len = "%"+ str(len(str(values[p][c][0]))+6) +"s"
-#                            parcomp = str(p) + '_' + str(c)
-#                            parcomp_len = len(parcomp)
-#                            parcomp_val_len = len(str(values[p][c][0]))
-#                            if parcomp_val_len > parcomp_len:
-#                                str_len = "%"+ str(parcomp_val_len + 3)  +"s"
-#                            else:
-#                                str_len = "%"+ str(parcomp_len + 3)  +"s"
-#                            if p == 'rv':
-#                                str_len = "%14s"
-#                            ofile.write(str_len % parcomp_val.upper()) # S
-#                # what of HJD is not assigned
-#                ofile.write("%8s%15s" % (str(groups[i]).zfill(3), names[i]))
-#                ofile.write('\n')
-#
-#        return values, allgroups, names
-
-    def write_shifted_spectra(self, outputfile=None, residuals=False):
+    def write_shifted_spectra(self, outputfile=None, residuals=False, binary=False):
         """
+        :param outputfile: prefix of the output files
+        :param residuals: write residuals instead of the synthetic spectra
+        :param binary: write binary .npy files without the header instead of ascii
         :return:
         """
         # setup name prefix
@@ -2528,7 +2438,9 @@ class Interface(object):
 
             # extract description of the comparison
             wave = cp['wave']
-            intens = sum_dict_keys(cp['synthetic'])
+            intens = cp['synthetic_sum']
+            if intens is None:
+                intens = sum_dict_keys(cp['synthetic'])
             wmin = cp['wmin']
             wmax = cp['wmax']
             component = cp['observed'].component
@@ -2536,8 +2448,17 @@ class Interface(object):
             rvgroup = cp['groups']['rv']
 
             # set name
-            name = '_'.join([outputfile, 'c', component, 'wmin', str(wmin), 'wmax', str(wmax), 'g', str(rvgroup)]) \
-                   + '.dat'
+            name = '_'.join([outputfile, 'c', component, 'wmin', str(wmin), 'wmax', str(wmax), 'g', str(rvgroup)])
+
+            if residuals:
+                oi = cp['observed'].get_spectrum(wmin, wmax)[1]
+                intens = oi - intens
+
+            # binary output skips the formatting
+            if binary:
+                np.save(name + '.npy', np.column_stack([wave, intens]))
+                continue
+            name += '.dat'
 
             # construct header of the file
             header = ''
@@ -2547,22 +2468,18 @@ class Interface(object):
             header += '# Residual: %s\n' % str(residuals)
 
             # write the synthetic spectrum
-            ofile = open(name, 'w')
-            ofile.writelines(header)
-            if residuals:
-                oi = cp['observed'].get_spectrum(wmin, wmax)[1]
-                np.savetxt(ofile, np.column_stack([wave, oi - intens]), fmt='%15.8e')
-            else:
-                np.savetxt(ofile, np.column_stack([wave, intens]), fmt='%15.8e')
-            ofile.close()
+            with open(name, 'w', buffering=1 << 20) as ofile:
+                write_numpy(ofile, np.column_stack([wave, intens]), fmt='%15.8e', header=header)
 
-    def write_synthetic_spectra(self, component=None, region=None, rvgroups=None, outputname=None, korel=False):
+    def write_synthetic_spectra(self, component=None, region=None, rvgroups=None, outputname=None, korel=False,
+                                binary=False):
         """
         Writes the synthetic spectra obtained through the fitting.
         :param component
         :param region
         :param outputname
         :param korel
+        :param binary: write binary .npy files without the header instead of ascii
         :return:
         """
 
@@ -2578,80 +2495,88 @@ class Interface(object):
         if isinstance(region, str):
             regions = [region]
 
+        # bind frequently called methods
+        get_parameter = self.sl.get_parameter
+        extract = self.extract_parameters
+
+        # get defined rv groups - they do not depend on the region
+        rv_groups = {}
+        for c in components:
+            if rvgroups is None:
+                rv_groups[c] = self.sl.get_defined_groups(component=c, parameter='rv')[c]['rv']
+            elif not isinstance(rvgroups, (list, tuple)):
+                rv_groups[c] = [rvgroups]
+            else:
+                rv_groups[c] = rvgroups
+
+        # the radial velocity parameters of each group
+        rv_pars = {rvg: get_parameter(rv=rvg) for rvg in set([g for c in components for g in rv_groups[c]])}
+
+        # physical parameters given by the regions
+        phys_pars = [x for x in self.sl.get_physical_parameters() if x not in ['rv']]
+
         # go over each region
         for r in regions:
 
             # get the wavelengths
             wmin = self.rl.mainList[r]['wmin']
             wmax = self.rl.mainList[r]['wmax']
+            synths_r = self.synthetics[r]
 
             # get defined groups for the region
             reg_groups = copy.deepcopy(self.rl.mainList[r]['groups'][0])
-            phys_pars = [x for x in self.sl.get_physical_parameters() if x not in ['rv']]
             for par in phys_pars:
-                if par not in list(reg_groups.keys()):
+                if par not in reg_groups:
                     reg_groups[par] = 0
 
             # get regional parameters
-            reg_pars = self.sl.get_parameter(**reg_groups)
+            reg_pars = get_parameter(**reg_groups)
 
             for c in components:
-                # get defined rv groups
-                if rvgroups is None:
-                    rv_groups = self.sl.get_defined_groups(component=c, parameter='rv')[c]['rv']
-                else:
-                    if not isinstance(rv_groups, (list, tuple)):
-                        rv_groups = [rv_groups]
+                # remaining parameters
+                cpars_base = reg_pars[c]
 
-                for rvg in rv_groups:
+                for rvg in rv_groups[c]:
 
                     # the outputname
                     if outputname is not None:
                         oname = '_'.join([outputname, 'c', c, 'r', str(wmin),
-                                          str(wmax), 'g', str(rvg)]) + '.dat'
+                                          str(wmax), 'g', str(rvg)])
                     else:
                         oname = '_'.join(['c', c, 'r', str(wmin),
-                                          str(wmax), 'g', str(rvg)]) + '.dat'
+                                          str(wmax), 'g', str(rvg)])
+                    oname += '.npy' if binary else '.dat'
 
                     if self.debug:
                         print("Writing spectrum: %s." % oname)
 
-                    # get the parameters
+                    # get the parameters and append
                     # the radial velocity
-                    rvpar = self.sl.get_parameter(rv=rvg)[c]
-
-                    # remaining parameters
-                    cpars = reg_pars[c]
-
-                    # append the radial velocity
-                    cpars.extend(rvpar)
-                    # print cpars
+                    cpars = cpars_base + rv_pars[rvg][c]
 
                     # separate those that need to be computed,
                     # i.e. those not defined by the grid
                     computepars = [par for par in cpars if par['name'] in self._not_given_by_grid]
-                    computepars = self.extract_parameters(computepars)
-                    # print computepars
+                    computepars = extract(computepars)
 
                     # compute the synthetic spectra
-                    w, i = self.synthetics[r][c].get_spectrum(wmin=wmin, wmax=wmax, korel=korel, **computepars)
+                    w, i = synths_r[c].get_spectrum(wmin=wmin, wmax=wmax, korel=korel, **computepars)
+
+                    # binary output skips the formatting
+                    if binary:
+                        np.save(oname, np.column_stack([w, i]))
+                        continue
 
                     # constrauct header of the file
                     header = ''
                     header += '# Component: %s\n' % str(c)
                     header += '# Region: (%s,%s)\n' % (str(wmin), str(wmax))
                     header += '# KOREL: %s\n' % str(korel)
-                    header += '# Parameters: %s\n' % str(self.extract_parameters(cpars))
+                    header += '# Parameters: %s\n' % str(extract(cpars))
 
                     # write the file
-                    ofile = open(oname, 'w')
-                    ofile.writelines(header)
-                    np.savetxt(ofile, np.column_stack([w, i]), fmt='%15.10e')
-                    ofile.close()
-
-                # destroy the
-                if rvgroups is None:
-                    rv_groups = None
+                    with open(oname, 'w', buffering=1 << 20) as ofile:
+                        write_numpy(ofile, np.column_stack([w, i]), fmt='%15.10e', header=header)
 
 
 class List(object):
@@ -2712,9 +2637,17 @@ class ObservedList(object):
         self._queriables = [x for x in self._property_list if x not in ['wmin', 'wmax']]
         self._queriable_floats = ['wmin', 'wmax']
 
+        # types in which the properties are stored and compared
+        self._prop_dtype = dict(component=str, filename=str, hasErrors=bool, korel=bool,
+                                loaded=bool, wmin=float, wmax=float)
+
         # initialize with empty lists
         self.observedSpectraList['properties'] = {key: [] for key in self._property_list}
 
+        # arrays and indices used for querying
+        self._read_property_arrays()
+        self._read_group_index()
+
         # debug
         self.debug = debug
 
@@ -2831,17 +2764,18 @@ class ObservedList(object):
             if component is not None and spectrum.component != component:
                 continue
 
-            for key in list(spectrum.group.keys()):
-                if key not in list(groups.keys()):
-                    groups[key] = []
-                if isinstance(spectrum.group[key], (list, tuple)):
-                    groups[key].extend(spectrum.group[key])
+            for key, value in spectrum.group.items():
+                if isinstance(value, (list, tuple)):
+                    groups.setdefault(key, []).extend(value)
                 else:
-                    groups[key].append(spectrum.group[key])
+                    groups.setdefault(key, []).append(value)
 
         # only unique values are needed
-        for key in list(groups.keys()):
-            groups[key] = np.unique(groups[key]).tolist()
+        for key, v in groups.items():
+            try:
+                groups[key] = sorted(set(v))
+            except TypeError:
+                groups[key] = np.unique(v).tolist()
 
         return groups
 
@@ -2851,18 +2785,14 @@ class ObservedList(object):
         :param verbose
         :return:
         """
-        # create a list of resolutions
-        resolutions = np.zeros(len(self))
-        for i in range(0, len(self)):
-            resolutions[i] = self.observedSpectraList['spectrum'][i].step
-
         # if verbose is set returns resolution for each spectrum
         if verbose:
-            return resolutions
+            return np.fromiter((s.step for s in self.observedSpectraList['spectrum']),
+                               dtype=float, count=len(self))
 
         # or just the maximum value
         else:
-            return np.max(resolutions)
+            return max(s.step for s in self.observedSpectraList['spectrum'])
 
     def get_spectra(self, verbose=False, permissive=False,  **kwargs):
         """
@@ -2883,10 +2813,10 @@ class ObservedList(object):
         # First of all check that all passed arguments are
         # either defined among queriables or is in groups
         to_pass = []
-        for key in list(kwargs.keys()):
+        for key in kwargs:
             # print key, self._queriables
             if (key not in self._queriables) & (key not in self._queriable_floats):
-                if key not in list(self.groupValues.keys()):
+                if key not in self.groupValues:
                     if permissive:
                         to_pass.append(key)
                         continue
@@ -2894,14 +2824,9 @@ class ObservedList(object):
                                    'the observed spectra, or is an attribute of Observed spectrum, but is not '
                                    'defined among queriables, or is wrong.' % key)
 
-        # create a copy of the spectralist
-        osl = copy.deepcopy(self.observedSpectraList)
-
-        # debug string
-        dbg_string = 'Queried: '
-
-        # reduce the list
-        for key in list(kwargs.keys()):
+        # indices of spectra matching each query
+        matches = []
+        for key in kwargs:
             #
             if key in to_pass:
                 continue
@@ -2909,50 +2834,81 @@ class ObservedList(object):
             # find all matching for a given key-word
             keytest = key.lower()
 
-            # these can be tested on equality as strings
-            if keytest in self._queriables:
-                vind = np.where(np.array(osl['properties'][keytest], dtype=str) == str(kwargs[key]))
-            elif keytest == 'component':
-                vind = np.where((np.array(osl['properties'][keytest], dtype=str) == str(kwargs[key])) or
-                                (np.array(osl['properties'][keytest], dtype=str) == 'all'))[0]
+            # spectra of all components match any component
+            if keytest == 'component':
+                match = set(np.flatnonzero(np.isin(self._prop_arrays[keytest], [str(kwargs[key]), 'all'])).tolist())
+            # these can be tested on equality in their own type
+            elif keytest in self._queriables:
+                value = kwargs[key]
+                if self._prop_dtype[keytest] is bool and isinstance(value, str):
+                    value = string2bool(value)
+                match = self._prop_index[keytest].get(self._prop_dtype[keytest](value), set())
             # that cannot be tested on equality
             elif keytest == 'wmin':
-                vind = np.where(np.array(osl['properties'][keytest]) <= kwargs[key])[0]
+                match = set(np.where(self._prop_arrays[keytest] <= kwargs[key])[0].tolist())
             elif keytest == 'wmax':
-                vind = np.where(np.array(osl['properties'][keytest]) >= kwargs[key])[0]
+                match = set(np.where(self._prop_arrays[keytest] >= kwargs[key])[0].tolist())
 
             # those that are defined in groups
-            elif keytest in list(osl['group'].keys()):
-                vind = []
-                for i in range(0, len(osl['spectrum'])):
-                    if isinstance(osl['group'][keytest][i], (tuple, list)):
-                        if kwargs[key] in osl['group'][keytest][i]:
-                            vind.append(i)
-                    else:
-                        if kwargs[key] == osl['group'][keytest][i]:
-                            vind.append(i)
-                vind = np.array(vind)
+            elif keytest in self._group_index:
+                match = self._group_index[keytest].get(kwargs[key], set())
+
+            matches.append((key, match))
+
+        # indices of spectra matching all queries, None
+        # stands for all spectra
+        vind = None
+
+        # debug string
+        dbg_string = 'Queried: '
+
+        # reduce the list, the most selective queries go first
+        for key, match in sorted(matches, key=lambda x: len(x[1])):
+            if vind is None:
+                vind = set(match)
+            else:
+                vind &= match
 
             if len(vind) == 0:
-                warnings.warn('No spectrum matching %s: %s was found in the '
-                              'list of observed spectra:\n%sDo not panic, it can '
-                              'still be listed among \'all\'.' % (key, str(kwargs[key]), str(self)))
-                return []
+                break
 
             if self.debug:
                 dbg_string += '%s: %s ' % (key, str(kwargs[key]))
                 print("%s.. %s spectra remain." % (dbg_string, str(len(vind))))
 
-            # extract them from the list
-            for dic in list(osl.keys()):
+        # nothing was found - the queries are replayed in their
+        # order to find the one that emptied the list. An empty
+        # match of a queriable is not reported, the empty remnant
+        # of the list is returned
+        if vind is not None and len(vind) == 0:
+            remnant = None
+            for key, match in matches:
+                remnant = set(match) if remnant is None else remnant & match
+                if len(remnant) == 0 and key.lower() not in self._queriables:
+                    warnings.warn('No spectrum matching %s: %s was found in the '
+                                  'list of observed spectra:\n%sDo not panic, it can '
+                                  'still be listed among \'all\'.' % (key, str(kwargs[key]), str(self)))
+                    return []
+
+        # create a shallow copy of the spectralist - the
+        # spectra are not copied
+        osl = dict(spectrum=list(self.observedSpectraList['spectrum']),
+                   group={k: list(v) for k, v in self.observedSpectraList['group'].items()},
+                   properties={k: list(v) for k, v in self.observedSpectraList['properties'].items()})
+
+        # extract them from the list - plain list indexing,
+        # because groups can be lists of different lengths
+        if vind is not None:
+            vind = sorted(vind)
+            for dic in osl:
                 # if the key refers to a dictionary
                 if isinstance(osl[dic], dict):
-                    for sub_key in list(osl[dic].keys()):
-                        osl[dic][sub_key] = (np.array(osl[dic][sub_key])[vind]).tolist()
+                    for sub_key in osl[dic]:
+                        osl[dic][sub_key] = [osl[dic][sub_key][i] for i in vind]
 
                 # if it refers to a list or array
                 else:
-                    osl[dic] = (np.array(osl[dic])[vind]).tolist()
+                    osl[dic] = [osl[dic][i] for i in vind]
 
         # simple output, just spectra
         if not verbose:
@@ -3018,7 +2974,7 @@ class ObservedList(object):
                 # cast the parameters to the correct types
                 parnames = ['filename', 'component', 'error', 'korel', 'hjd']
                 cast_types = [str, str, float, string2bool, float]
-                for k in list(cdict.keys()):
+                for k in cdict:
                     if k in parnames:
                         i = parnames.index(k)
                         if cdict[k] != 'None':
@@ -3030,9 +2986,9 @@ class ObservedList(object):
                         cdict[k] = int(cdict[k])
 
                 # add the parameter if it does not exist
-                groups = {key: cdict[key] for key in list(cdict.keys()) if key not in parnames}
-                kwargs = {key: cdict[key] for key in list(cdict.keys()) if key in parnames}
-                ol.add_one_observation(group=groups, **kwargs)
+                groups = {key: cdict[key] for key in cdict if key not in parnames}
+                kwargs = {key: cdict[key] for key in cdict if key in parnames}
+                ol.add_one_observation(update=False, group=groups, **kwargs)
 
             # do the same for enviromental keys
             if d[0].find('env_keys') > -1:
@@ -3043,7 +2999,7 @@ class ObservedList(object):
                 recs = ['debug']
                 cast_types = [string2bool]
                 cdict = {d[i].rstrip(':'): d[i+1] for i in range(0, len(d), 2)}
-                for k in list(cdict.keys()):
+                for k in cdict:
                     if k in recs:
                         i = recs.index(k)
                         ctype = cast_types[i]
@@ -3051,8 +3007,16 @@ class ObservedList(object):
 
                     # assign the vlues
                     setattr(ol, k, cdict[k])
+
+        # builds the observedSpectraList dictionary
+        # once all spectra are attached
+        if len(ol) > 0:
+            ol.read_groups()
+            ol.read_properties()
+            ol.groupValues = ol.get_defined_groups()
+
         # finally assign everything to self
-        attrs = ['debug', 'groupValues', 'observedSpectraList']
+        attrs = ['debug', 'groupValues', 'observedSpectraList', '_group_index', '_prop_arrays', '_prop_index']
         for attr in attrs:
             setattr(self, attr, getattr(ol, attr))
 
@@ -3089,43 +3053,30 @@ class ObservedList(object):
 
         # check that rv has been setup - mandatory, because each observed spectrum
         # is assigned its own rv_group
-        if 'rv' not in list(groups.keys()):
+        if 'rv' not in groups:
             groups['rv'] = []
 
-        # assign empty group arrays
-        for key in list(groups.keys()):
-            self.observedSpectraList['group'][key] = np.zeros(len(self)).astype('int16').tolist()
-
         # Assigning groups to every spectrum
-        for i, spectrum in enumerate(self.observedSpectraList['spectrum']):
-            for key in list(groups.keys()):
-                # If not user defined the maximal possible
-                # group is assigned
-                if key != 'rv':
-                    gn = spectrum.get_group(key)
-                    def_groups = groups[key]
-                    # print key, gn, def_groups
-
-                    # if spectrum has no group, but some groups have been defined,
-                    # the group is assigned to the least number not in defuined groups
-                    if gn is None and len(def_groups) > 0:
-                        gn = 0
-                        while gn in def_groups:
-                            gn += 1
-
-                    # if no group is defined for all spectra, start with zero
-                    elif gn is None and len(def_groups) == 0:
-                        gn = 0
-
-                    # store the groupnumber
-                    self.observedSpectraList['group'][key][i] = gn
-
-                else:
-                    gn = spectrum.get_group(key)
-                    if gn is None:
-                        self.observedSpectraList['group'][key][i] = None
-                    else:
-                        self.observedSpectraList['group'][key][i] = gn
+        spectra = self.observedSpectraList['spectrum']
+        for key in groups:
+            # If not user defined the maximal possible
+            # group is assigned
+            if key != 'rv':
+                # if spectrum has no group, but some groups have been defined,
+                # the group is assigned to the least number not in defuined groups
+                # if no group is defined for all spectra, start with zero
+                def_groups = groups[key]
+                free = 0
+                while free in def_groups:
+                    free += 1
+
+                # store the groupnumbers
+                gns = [spectrum.get_group(key) for spectrum in spectra]
+                self.observedSpectraList['group'][key] = [free if gn is None else gn for gn in gns]
+
+            # rv groups are left unassigned
+            else:
+                self.observedSpectraList['group'][key] = [spectrum.get_group(key) for spectrum in spectra]
 
         # propagate the groups back to spectra
         self._set_groups_to_spectra()
@@ -3136,14 +3087,50 @@ class ObservedList(object):
         stores them within the observedSpectraList
         dictionary.
         """
-        # initialize with empty lists
-        for key in self._property_list:
+        # read all properties of each spectrum at once
+        getter = attrgetter(*self._property_list)
+        rows = [getter(spectrum) for spectrum in self.observedSpectraList['spectrum']]
+
+        # fill the dictionary column by column
+        for j, key in enumerate(self._property_list):
             self.observedSpectraList['properties'][key] = np.empty(len(self), dtype=object)
+            self.observedSpectraList['properties'][key][:] = [row[j] for row in rows]
 
-        # fill the dictionary
-        for i, spectrum in enumerate(self.observedSpectraList['spectrum']):
-            for key in self._property_list:
-                self.observedSpectraList['properties'][key][i] = getattr(spectrum, key)
+        # update the arrays used for querying
+        self._read_property_arrays()
+
+    def _read_group_index(self):
+        """
+        Stores indices of spectra for every value of
+        every group, so that groups can be queried
+        without going through all spectra.
+        """
+        self._group_index = {}
+        for key, values in self.observedSpectraList['group'].items():
+            index = self._group_index[key] = {}
+            for i, gn in enumerate(values):
+                if not isinstance(gn, (list, tuple)):
+                    gn = [gn]
+                for g in gn:
+                    index.setdefault(g, set()).add(i)
+
+    def _read_property_arrays(self):
+        """
+        Stores the properties as arrays of their own type,
+        which can be queried without converting them over
+        and over. Indices of spectra are stored for every
+        value of the queriables.
+        """
+        self._prop_arrays = {}
+        for key in self._property_list:
+            self._prop_arrays[key] = np.array(self.observedSpectraList['properties'][key],
+                                              dtype=self._prop_dtype[key])
+
+        self._prop_index = {}
+        for key in self._queriables:
+            index = self._prop_index[key] = {}
+            for i, v in enumerate(self._prop_arrays[key].tolist()):
+                index.setdefault(v, set()).add(i)
 
     def save(self, ofile):
         """
@@ -3164,7 +3151,7 @@ class ObservedList(object):
                 if k not in ['groups']:
                     string += '%s: %s ' % (k, str(getattr(s, k)))
                 else:
-                    for gk in list(s.group.keys()):
+                    for gk in s.group:
                         if isinstance(s.group[gk], (list, tuple)):
                             string += '%s: ' % gk
                             for gn in s.group[gk]:
@@ -3192,7 +3179,7 @@ class ObservedList(object):
         # print kwargs
         for i in range(0, len(self)):
             if self.observedSpectraList['spectrum'][i].filename == filename:
-                for key in list(kwargs.keys()):
+                for key in kwargs:
                     setattr(self.observedSpectraList['spectrum'][i], key, kwargs[key])
                 if key == 'group':
                     self.observedSpectraList['spectrum'][i].set_group(kwargs[key])
@@ -3206,9 +3193,13 @@ class ObservedList(object):
         Propagates groups, which are set in observedSpectraList,
         in individual spectra.
         """
-        for i in range(0, len(self.observedSpectraList['spectrum'])):
-            group = {key: self.observedSpectraList['group'][key][i] for key in list(self.observedSpectraList['group'].keys())}
-            self.observedSpectraList['spectrum'][i].set_group(group)
+        keys = list(self.observedSpectraList['group'])
+        columns = [self.observedSpectraList['group'][key] for key in keys]
+        for spectrum, values in zip(self.observedSpectraList['spectrum'], zip(*columns)):
+            spectrum.set_group(dict(zip(keys, values)))
+
+        # update the index used for querying
+        self._read_group_index()
 
 
 class RegionList(List):
@@ -3227,13 +3218,21 @@ class RegionList(List):
         self._registered_records = ['components', 'groups', 'wmin', 'wmax']
 
         # if not given along the class a blank one is created
-        if len(list(self.mainList.keys())) < 1:
+        if len(self.mainList) < 1:
             self.mainList = {}
             self._registered_regions = []
             self._user_defined_groups = {}
         else:
             self._registered_regions = self.get_registered_regions()
 
+        # the least group number, which is
+        # not user-defined for each parameter
+        self._free_groups = {}
+
+        # regions indexed by their rounded boundaries
+        # and sets of components of each region
+        self._read_region_indices()
+
     def __str__(self):
         """
         String representation of the class.
@@ -3243,7 +3242,7 @@ class RegionList(List):
         string = ''
 
         # go over regions
-        for key0 in list(self.mainList.keys()):
+        for key0 in self.mainList:
             # region properties
             string += "Region name: %s: (wmin, wmax) = (%s, %s):\n" % (key0, str(self.mainList[key0]['wmin']),
                                                                        str(self.mainList[key0]['wmax']))
@@ -3285,8 +3284,11 @@ class RegionList(List):
         if ident is not None:
             ident = ident.lower()
 
+        # parameters, which have some groups defined
+        defined_keys = set(self._user_defined_groups)
+
         # maybe the region has been already defined
-        if ident in list(self.mainList.keys()):
+        if ident in self.mainList:
             region = ident
         elif ident is None:
             region = self.get_region(wmin, wmax)
@@ -3316,11 +3318,10 @@ class RegionList(List):
             # print groups, self.mainList[region]['groups']
             groups['lr'] = self.mainList[region]['groups'][0]['lr']
 
-            self.read_user_defined_groups(groups)
-
             # store everything apart from the wmin, wmax
             self.mainList[region]['groups'].append(groups)
             self.mainList[region]['components'].append(component)
+            self._components_by_region[region].add(component)
 
             # readout user-defined groups
             self.read_user_defined_groups(groups)
@@ -3336,25 +3337,23 @@ class RegionList(List):
             # register the new region
             self.mainList[ident] = dict(wmin=wmin, wmax=wmax, components=[component], groups=[])
             self._registered_regions.append(ident)
+            self._region_by_bounds.setdefault(self._bounds_key(wmin, wmax), []).append(ident)
+            self._components_by_region[ident] = set([component])
 
-            # if the luminosity group is not defined
-            if 'lr' not in list(groups.keys()):
-                all_groups = self.get_defined_groups()
-                if 'lr' in list(all_groups.keys()):
-                    def_groups = all_groups['lr']
-                else:
-                    def_groups = []
-                gn = 0
-                while gn in def_groups:
-                    gn += 1
-                groups['lr'] = gn
+            # if the luminosity group is not defined - lr
+            # is set for every record before it is read out,
+            # so all defined lr groups are user-defined
+            if 'lr' not in groups:
+                groups['lr'] = self._get_free_group('lr')
 
             # add groups to the list
             self.mainList[ident]['groups'].append(groups)
             # readout user-defined groups
             self.read_user_defined_groups(groups)
 
-        self.setup_undefined_groups()
+        # setup default groups for the new record
+        # and for the newly defined parameters
+        self._setup_undefined_groups(groups, [key for key in groups if key not in defined_keys])
 
     def clear_all(self):
         """
@@ -3365,6 +3364,9 @@ class RegionList(List):
         super(RegionList, self).clear_all()
         self._registered_regions = []
         self._user_defined_groups = {}
+        self._free_groups = {}
+        self._region_by_bounds = {}
+        self._components_by_region = {}
 
     def get_defined_groups(self):
         """
@@ -3372,14 +3374,16 @@ class RegionList(List):
         :return: list of defined groups
         """
         groups = {}
+
+        # sets of already listed groups, so the
+        # order of the lists is kept
+        seen = {}
         for reg in self._registered_regions:
             for rec in self.mainList[reg]['groups']:
-                for key in list(rec.keys()):
-                    if key not in list(groups.keys()):
-                        groups[key] = [rec[key]]
-                    else:
-                        if rec[key] not in groups[key]:
-                            groups[key].append(rec[key])
+                for key, value in rec.items():
+                    if value not in seen.setdefault(key, set()):
+                        seen[key].add(value)
+                        groups.setdefault(key, []).append(value)
 
         return groups
 
@@ -3392,11 +3396,26 @@ class RegionList(List):
         :return:
         """
 
-        for region in self.mainList:
-            if (abs(self.mainList[region]['wmin'] - wmin) < ZERO_TOLERANCE) & \
-               (abs(self.mainList[region]['wmax'] - wmax) < ZERO_TOLERANCE):
-                return region
-        return None
+        # boundaries within the tolerance can be
+        # rounded to the neighbouring keys
+        kmin, kmax = self._bounds_key(wmin, wmax)
+        candidates = []
+        for i in (0, -1, 1):
+            for j in (0, -1, 1):
+                # regions under one key are listed in the order
+                # of registration, so the first match is kept
+                for region in self._region_by_bounds.get((kmin + i, kmax + j), []):
+                    if (abs(self.mainList[region]['wmin'] - wmin) < ZERO_TOLERANCE) & \
+                       (abs(self.mainList[region]['wmax'] - wmax) < ZERO_TOLERANCE):
+                        candidates.append(region)
+                        break
+
+        if len(candidates) < 2:
+            return candidates[0] if candidates else None
+
+        # matches under different keys - the first registered wins
+        order = list(self.mainList)
+        return min(candidates, key=order.index)
 
     def get_region_groups(self):
         """
@@ -3406,24 +3425,21 @@ class RegionList(List):
                 through set_groups
         """
         groups = {}
+        seen = {}
 
         # go over each region
-        for reg in list(self.mainList.keys()):
-            for i in range(0, len(self.mainList[reg]['components'])):
-                component = self.mainList[reg]['components'][i]
-                comp_groups = self.mainList[reg]['groups'][i]
+        for reg in self.mainList:
+            for component, comp_groups in zip(self.mainList[reg]['components'], self.mainList[reg]['groups']):
 
                 # setup component
-                if component not in list(groups.keys()):
-                    groups[component] = {}
+                groups.setdefault(component, {})
+                seen.setdefault(component, {})
 
                 # setup keys
-                for key in list(comp_groups.keys()):
-                    if key not in list(groups[component].keys()):
-                        groups[component][key] = [comp_groups[key]]
-                    else:
-                        if comp_groups[key] not in groups[component][key]:
-                            groups[component][key].append(comp_groups[key])
+                for key, value in comp_groups.items():
+                    if value not in seen[component].setdefault(key, set()):
+                        seen[component][key].add(value)
+                        groups[component].setdefault(key, []).append(value)
         return groups
 
     def get_registered_regions(self):
@@ -3442,7 +3458,7 @@ class RegionList(List):
         wmins = []
         wmaxs = []
         regs = []
-        for reg in list(self.mainList.keys()):
+        for reg in self.mainList:
             wmins.append(self.mainList[reg]['wmin'])
             wmaxs.append(self.mainList[reg]['wmax'])
             regs.append(reg)
@@ -3470,25 +3486,18 @@ class RegionList(List):
         if not append:
             self.clear_all()
 
-        # empty arrays for limits
-        limits = {}
-        # the rounding is there get over stupid problems with float precision
+        # pairs of limits of each spectrum - the rounding
+        # is there get over stupid problems with float precision
+        pairs = {}
         for obs in ol:
-            component = obs.component
-            if component not in limits:
-                limits[component] = [[], []]
-
-            limits[component][0].append(np.ceil(obs.wmin))
-            limits[component][1].append(np.floor(obs.wmax))
-
-            # get only unique values
-            for i in range(0, 2):
-                limits[component][i] = np.unique(limits[component][i])
+            pairs.setdefault(obs.component, set()).add((float(math.ceil(obs.wmin)), float(math.floor(obs.wmax))))
 
-        # check that something funny did not happen
-        for component in list(limits.keys()):
-            if len(limits[component][0]) != len(limits[component][1]):
-                raise ValueError('The limits were not read out correctly from observed spectra.')
+        # get only unique pairs, so the limits of
+        # one spectrum are kept together
+        limits = {}
+        for component in pairs:
+            wmins, wmaxs = zip(*sorted(pairs[component]))
+            limits[component] = [np.array(wmins), np.array(wmaxs)]
 
             # setup the regions
             for i in range(0, len(limits[component][0])):
@@ -3506,11 +3515,8 @@ class RegionList(List):
         :param component:
         :return: bool has/has_not the component
         """
-
-        for regcomp in self.mainList[region]['components']:
-            if (regcomp == component) or (regcomp == 'all'):
-                return True
-        return False
+        regcomps = self._components_by_region[region]
+        return (component in regcomps) or ('all' in regcomps)
 
     def load(self, f):
         """
@@ -3520,72 +3526,59 @@ class RegionList(List):
         :return:
         """
 
-        # read the file
-        lines = read_text_file(f)
-        data_start = len(lines)
-        for i, l in enumerate(lines):
-            if l.find('REGIONLIST') > -1:
-                data_start = i
-                break
-
-        # check that there are actually some data in the file
-        # if not we failed
-        if data_start >= len(lines):
-            return False
-
         # create a regionlist
         rl = RegionList()
 
-        # from here the file is actually being read
-        for i, l in enumerate(lines[data_start+1:]):
+        # read the file line by line
+        with open(f, 'r') as ifile:
 
-            # once we reach regionlist, we end
-            if l.find('REGIONLIST') > -1:
-                break
-            # split the linbe
-            d = l.split()
-            # print d
-            if d[0].find('identification') > -1:
-                cdict = {d[i].rstrip(':'): d[i+1] for i in range(0, len(d), 2)}
-                # print cdict
-                # cast the paramneters to teh correct types
-                parnames = ['wmin', 'wmax', 'identification', 'component']
-                cast_types = [float, float, str, str]
-                for k in list(cdict.keys()):
-                    if k in parnames:
-                        i = parnames.index(k)
-                        cdict[k] = cast_types[i](cdict[k])
-                    else:
-                        # the remaining must be groups
-                        cdict[k] = int(cdict[k])
-
-                # add the parameter if it does not exist
-                groups = {key: cdict[key] for key in list(cdict.keys()) if key not in parnames}
-                kwargs = {key: cdict[key] for key in list(cdict.keys()) if key in parnames}
-                # print groups
-                # # print kwargs
-                rl.add_region(groups=groups, **kwargs)
+            # check that there are actually some data in the file
+            # if not we failed
+            for l in ifile:
+                if 'REGIONLIST' in l:
+                    break
+            else:
+                return False
 
-            # do the same for enviromental keys
-            if d[0].find('env_keys') > -1:
-                # the first string is just identification
-                d = d[1:]
+            # from here the file is actually being read
+            for l in ifile:
 
-                # secure corrct types
-                recs = ['debug']
-                cast_types = [string2bool]
-                cdict = {d[i].rstrip(':'): d[i+1] for i in range(0, len(d), 2)}
-                for k in list(cdict.keys()):
-                    if k in recs:
-                        i = recs.index(k)
-                        ctype = cast_types[i]
-                        cdict[k] = ctype(cdict[k])
+                # once we reach regionlist, we end
+                if 'REGIONLIST' in l:
+                    break
+                # split the linbe
+                d = l.split()
+                # print d
+                if d[0].find('identification') > -1:
+                    # cast the paramneters to teh correct types
+                    # the remaining must be groups
+                    cdict = {k.rstrip(':'): v for k, v in zip(d[::2], d[1::2])}
+                    cdict = {k: _REGIONLIST_TYPES.get(k, int)(v) for k, v in cdict.items()}
+
+                    # add the parameter if it does not exist
+                    groups = {key: cdict[key] for key in cdict if key not in _REGIONLIST_TYPES}
+                    kwargs = {key: cdict[key] for key in cdict if key in _REGIONLIST_TYPES}
+                    # print groups
+                    # # print kwargs
+                    rl.add_region(groups=groups, **kwargs)
+
+                # do the same for enviromental keys
+                if d[0].find('env_keys') > -1:
+                    # the first string is just identification
+                    d = d[1:]
+
+                    # secure corrct types
+                    for k, v in zip(d[::2], d[1::2]):
+                        k = k.rstrip(':')
+                        if k in _ENV_TYPES:
+                            v = _ENV_TYPES[k](v)
+
+                        # assign the vlues
+                        setattr(rl, k, v)
 
-                    # assign the vlues
-                    setattr(rl, k, cdict[k])
         # finally assign everything to self
         attrs = ['_registered_records', '_registered_regions', '_user_defined_groups',
-                 'mainList', 'debug']
+                 'mainList', 'debug', '_components_by_region', '_region_by_bounds', '_free_groups']
         for attr in attrs:
             setattr(self, attr, getattr(rl, attr))
 
@@ -3599,12 +3592,8 @@ class RegionList(List):
         :param groups groups to be read
         :return: None
         """
-        for key in list(groups.keys()):
-            if key not in list(self._user_defined_groups.keys()):
-                self._user_defined_groups[key] = [groups[key]]
-            else:
-                if groups[key] not in self._user_defined_groups[key]:
-                    self._user_defined_groups[key].append(groups[key])
+        for key, value in groups.items():
+            self._user_defined_groups.setdefault(key, set()).add(value)
 
     def save(self, ofile):
         """
@@ -3618,31 +3607,55 @@ class RegionList(List):
 
         # parameters listed for each record in the RegionList
         enviromental_keys = ['debug']
-        string = ' REGIONLIST '.rjust(105, '#').ljust(200, '#') + '\n'
-        for ident in list(self.mainList.keys()):
+        parts = [' REGIONLIST '.rjust(105, '#').ljust(200, '#') + '\n']
+        for ident in self.mainList:
             for i, c in enumerate(self.mainList[ident]['components']):
-                string += 'identification: %s ' % ident
+                parts.append('identification: %s ' % ident)
 
                 # write the wavelengths
                 for lkey in ['wmin', 'wmax']:
-                    string += '%s: %s ' % (lkey, str(self.mainList[ident][lkey]))
+                    parts.append('%s: %s ' % (lkey, str(self.mainList[ident][lkey])))
 
                 # write components
-                string += "component: %s " % c
+                parts.append("component: %s " % c)
 
                 # and groups
-                for gkey in list(self.mainList[ident]['groups'][i].keys()):
-                    string += "%s: %s " % (gkey, str(self.mainList[ident]['groups'][i][gkey]))
-            string += '\n'
+                for gkey in self.mainList[ident]['groups'][i]:
+                    parts.append("%s: %s " % (gkey, str(self.mainList[ident]['groups'][i][gkey])))
+            parts.append('\n')
 
         # setup additional parameters
-        string += 'env_keys: '
+        parts.append('env_keys: ')
         for ekey in enviromental_keys:
-            string += '%s: %s ' % (ekey, str(getattr(self, ekey)))
-        string += '\n'
-        string += ' REGIONLIST '.rjust(105, '#').ljust(200, '#') + '\n'
+            parts.append('%s: %s ' % (ekey, str(getattr(self, ekey))))
+        parts.append('\n')
+        parts.append(' REGIONLIST '.rjust(105, '#').ljust(200, '#') + '\n')
         # write the remaining parameters
-        ofile.writelines(string)
+        ofile.write(''.join(parts))
+
+    def _bounds_key(self, wmin, wmax):
+        """
+        Rounds the region boundaries to the tolerance
+        within which two regions are considered the same.
+        :param wmin
+        :param wmax
+        :return: tuple of the rounded boundaries
+        """
+        return int(round(wmin / ZERO_TOLERANCE)), int(round(wmax / ZERO_TOLERANCE))
+
+    def _read_region_indices(self):
+        """
+        Indexes the registered regions by their boundaries,
+        so get_region does not go through all regions, and
+        stores a set of components for each region.
+        :return: None
+        """
+        self._region_by_bounds = {}
+        self._components_by_region = {}
+        for region in self.mainList:
+            key = self._bounds_key(self.mainList[region]['wmin'], self.mainList[region]['wmax'])
+            self._region_by_bounds.setdefault(key, []).append(region)
+            self._components_by_region[region] = set(self.mainList[region]['components'])
 
     def setup_undefined_groups(self):
         """
@@ -3664,17 +3677,51 @@ class RegionList(List):
             for i, comp_group in enumerate(self.mainList[region]['groups']):
 
                 # go over each defined group
-                for key in list(groups.keys()):
+                for key in groups:
                     # if the key is unset for the component
                     # we have to assign some. This must
                     # not be one of the user-defined.
                     # That is why we maintain dictionary
                     # of user defined groups.
-                    if key not in list(comp_group.keys()):
-                        gn = 0
-                        while gn in self._user_defined_groups[key]:
-                            gn += 1
-                        self.mainList[region]['groups'][i][key] = gn
+                    if key not in comp_group:
+                        self.mainList[region]['groups'][i][key] = self._get_free_group(key)
+
+    def _get_free_group(self, key):
+        """
+        Returns the least group number, which is not
+        user-defined. User-defined groups are only
+        added, so the search continues from the last one.
+        :param key: parameter name
+        :return: group number
+        """
+        gn = self._free_groups.get(key, 0)
+        def_groups = self._user_defined_groups.get(key, ())
+        while gn in def_groups:
+            gn += 1
+        self._free_groups[key] = gn
+        return gn
+
+    def _setup_undefined_groups(self, groups, new_keys):
+        """
+        Does the same as setup_undefined_groups after
+        a single record was attached. Only the new record
+        and parameters it defines for the first time
+        can lack their groups.
+        :param groups: groups of the new record
+        :param new_keys: parameters defined by the new record only
+        :return: None
+        """
+        for key in self._user_defined_groups:
+            if key not in groups:
+                groups[key] = self._get_free_group(key)
+
+        # the remaining records
+        for key in new_keys:
+            gn = self._get_free_group(key)
+            for region in self._registered_regions:
+                for comp_group in self.mainList[region]['groups']:
+                    if key not in comp_group:
+                        comp_group[key] = gn
 
 
 class StarList(object):
@@ -3711,14 +3758,14 @@ class StarList(object):
         """
         :return: string = string represantation of the class
         """
-        string = ''
-        for component in list(self.componentList.keys()):
-            string += "Component: %s\n" % component
-            for parkey in list(self.componentList[component].keys()):
+        parts = []
+        for component in self.componentList:
+            parts.append("Component: %s\n" % component)
+            for parkey in self.componentList[component]:
                 for par in self.componentList[component][parkey]:
-                    string += str(par)
+                    parts.append(str(par))
 
-        return string
+        return ''.join(parts)
 
     def add_component(self, component=None, groups={}, use_defaults=True, **kwargs):
         """
@@ -3750,31 +3797,34 @@ class StarList(object):
 
         # the parameters will be stored in a dictionary
         self.componentList[component] = dict()
-        pd = copy.deepcopy(parameter_definitions)
+        # definitions hold only immutable values, which
+        # are copied by Parameter, so only the records
+        # with changed groups have to be copied
+        pd = dict(parameter_definitions)
 
         # setup groups for default parameters
-        for key in list(groups.keys()):
-            if key in list(pd.keys()):
-                pd[key]['group'] = groups[key]
+        for key in groups:
+            if key in pd:
+                pd[key] = dict(pd[key], group=groups[key])
 
         # process the keyword-arguments
-        for key in list(kwargs.keys()):
+        for key, value in kwargs.items():
             keytest = key.lower()
             # if we pass par + value, it is just stored
-            if keytest in list(pd.keys()) and kwargs[key] is not None:
+            if keytest in pd and value is not None:
                 self.componentList[component][keytest] = []
-                self.componentList[component][keytest].append(Parameter(**pd[key]))
-                self.componentList[component][keytest][-1]['value'] = kwargs[key]
-            elif kwargs[key] is None:
+                self.componentList[component][keytest].append(Parameter(**pd[keytest]))
+                self.componentList[component][keytest][-1]['value'] = value
+            elif value is None:
                 warnings.warn('The parameter %s is set to %s. Therefore it is not '
-                              'included into component parameters.' % (key, str(kwargs[key])))
-            elif keytest not in list(pd.keys()) and kwargs[key] is not None:
+                              'included into component parameters.' % (key, str(value)))
+            else:
 
                 # set up group
-                if keytest in list(groups.keys()):
+                if keytest in groups:
                     group = groups[keytest]
                 self.componentList[component][keytest] = []
-                self.componentList[component][keytest].append(Parameter(name=key, value=kwargs[key], group=group))
+                self.componentList[component][keytest].append(Parameter(name=key, value=value, group=group))
                 self.componentList[component][keytest][-1].set_empty()
                 warnings.warn('The parameter %s: %s is not set among the '
                               'parameter definitions. Therefore you should pay '
@@ -3782,8 +3832,8 @@ class StarList(object):
 
         # pass all unset parameters in definitions
         if use_defaults:
-            for key in list(pd.keys()):
-                if key not in list(self.componentList[component].keys()):
+            for key in pd:
+                if key not in self.componentList[component]:
                     self.componentList[component][key] = []
                     self.componentList[component][key].append(Parameter(**pd[key]))
 
@@ -3800,14 +3850,17 @@ class StarList(object):
         :return:
         """
         if p is None:
-            self.componentList[component][kwargs['name']] = []
-            self.componentList[component][kwargs['name']].append(Parameter(**kwargs))
+            name = kwargs['name']
+            self.componentList[component][name] = []
+            self.componentList[component][name].append(Parameter(**kwargs))
         else:
             # print p['name']
-            self.componentList[component][p['name']].append(copy.deepcopy(p))
+            name = p['name']
+            self.componentList[component][name].append(copy.deepcopy(p))
 
-        # redefine groups
-        self.read_groups()
+        # redefine groups - only those of
+        # the extended parameter could change
+        self._read_parameter_groups(component, name)
         self.get_fitted_types()
 
     def add_parameter_to_all(self, **kwargs):
@@ -3845,6 +3898,9 @@ class StarList(object):
         else:
             components = [component]
 
+        # lowercase keys are the same for all components
+        kw_lower = {key.lower(): value for key, value in kwargs.items()}
+
         clones = []
         # go over each component
         for component in components:
@@ -3854,9 +3910,8 @@ class StarList(object):
             clones.append(clone)
 
             # adjust its values
-            for key in list(kwargs.keys()):
-                keytest = key.lower()
-                clone[keytest] = kwargs[key]
+            for keytest, value in kw_lower.items():
+                clone[keytest] = value
 
             # append the new component to the componentlist
             self.add_parameter_to_component(component, p=clone)
@@ -3884,15 +3939,12 @@ class StarList(object):
         """
 
         for component in self._registered_components:
-            for parkey in list(self.componentList[component].keys()):
-                i = 0
-                while i < len(self.componentList[component][parkey]):
+            for parkey in self.componentList[component]:
 
-                    # if the parameter group is not, it is deleted
-                    if self.componentList[component][parkey][i]['group'] is None:
-                        del self.componentList[component][parkey][i]
-                    else:
-                        i += 1
+                # if the parameter group is not, it is deleted
+                pars = self.componentList[component][parkey]
+                pars[:] = [par for par in pars if par['group'] is not None]
+                self._read_parameter_groups(component, parkey)
 
     def delete_duplicities(self):
         """
@@ -3901,16 +3953,17 @@ class StarList(object):
         """
         for component in self._registered_components:
             # groups can a have to be the same for two components ofc,
-            def_groups = []
-            for parkey in list(self.componentList[component].keys()):
-                i = 0
-                while i < len(self.componentList[component][parkey]):
-                    if self.componentList[component][parkey][i]['group'] not in def_groups:
-                        def_groups.append(self.componentList[component][parkey][i]['group'])
-                        i += 1
+            def_groups = set()
+            for parkey in self.componentList[component]:
+                pars = self.componentList[component][parkey]
+                kept = []
+                for par in pars:
                     # if the parameter with the group has been already defined, delete it
-                    else:
-                        del self.componentList[component][parkey][i]
+                    if par['group'] not in def_groups:
+                        def_groups.add(par['group'])
+                        kept.append(par)
+                pars[:] = kept
+                self._read_parameter_groups(component, parkey)
 
     def get_common_groups(self):
         """
@@ -3928,26 +3981,15 @@ class StarList(object):
             # define teh reference component
             comp0 = self._registered_components[0]
 
-            # groups are always common for one parameter
-            if len(self._registered_components) < 2:
-                is_common = True
-
-            # go over each group of
-            for i in range(0, len(self.componentList[comp0][key])):
-                refpar = self.componentList[comp0][key][i]
-                # print refpar
-
-                # at the beginning
-                for component in self._registered_components[1:]:
-                    is_common = False
-                    for j, par in enumerate(self.componentList[component][key]):
-                        # print par
-                        if refpar['group'] == par['group']:
-                            is_common = True
-                            break
-                    if not is_common:
-                        break
-                if is_common:
+            # groups shared by all components - groups
+            # are always common for one parameter
+            shared = set.intersection(*[set(par['group'] for par in self.componentList[component][key])
+                                        for component in self._registered_components])
+
+            # go over each group of the reference component,
+            # so their order is kept
+            for refpar in self.componentList[comp0][key]:
+                if refpar['group'] in shared:
                     com_groups[key].append(refpar['group'])
 
         return com_groups
@@ -3957,7 +3999,7 @@ class StarList(object):
         Returns list of all defined components.
         :return:
         """
-        return copy.deepcopy(self._registered_components)
+        return list(self._registered_components)
 
     def get_defined_groups(self, component=None, parameter=None):
         """:
@@ -3985,20 +4027,18 @@ class StarList(object):
 
             # go over passed parameters
             for param in parameters:
-                groups[comp][param] = []
-                for regparam in self.componentList[comp][param]:
-                    if regparam.name == param:
-                        groups[comp][param].append(regparam.group)
+                groups[comp][param] = [regparam.group for regparam in self.componentList[comp][param]
+                                       if regparam.name == param]
 
         # merge groups if component was 'all'
         if component == 'all':
+            groups[component] = {}
             for p in parameters:
-                groups[component] = {}
                 temp = []
                 for c in components:
                     # print flatten_2d(groups[c][p])
                     temp.extend(groups[c][p])
-                groups[component][p] = np.unique(temp).tolist()
+                groups[component][p] = sorted(set(temp))
 
         return groups
 
@@ -4016,13 +4056,14 @@ class StarList(object):
         if verbose:
             fit_pars_info = {'component': [], 'group': [], 'name': [], 'value': []}
         # go over all parameters and components
+        parnames = self.get_physical_parameters()
         for c in self._registered_components:
-            for parname in self.get_physical_parameters():
+            for parname in parnames:
                 for par in self.componentList[c][parname]:
-                    if par['fitted']:
+                    if par.fitted:
                         fit_pars.append(par)
                         if verbose:
-                            for k in list(fit_pars_info.keys()):
+                            for k in fit_pars_info:
                                 if k != 'component':
                                     fit_pars_info[k].append(par[k])
                                 else:
@@ -4042,20 +4083,11 @@ class StarList(object):
 
         fitted_types = {}
 
-        # go over each component
-        for c in list(self.componentList.keys()):
-            fitted_types[c] = []
-
-            # go over each parameter type
-            for parname in self.componentList[c]:
-
-                # and finaly over each parameter
-                for par in self.componentList[c][parname]:
-                    if parname not in fitted_types[c]:
-                        if par['fitted']:
-                            fitted_types[c].append(parname)
-                    else:
-                        break
+        # go over each component and parameter type,
+        # which is fitted if any of its parameters is
+        for c in self.componentList:
+            fitted_types[c] = [parname for parname, pars in self.componentList[c].items()
+                               if any(par.fitted for par in pars)]
 
         # print fitted_types
         self.fitted_types = fitted_types
@@ -4070,7 +4102,7 @@ class StarList(object):
         """
 
         for i, par in enumerate(self.componentList[component][parameter]):
-            if par['group'] == group:
+            if par.group == group:
                 return i
 
         warnings.warn('Component: %s Parameter: %s Group: %s'
@@ -4083,11 +4115,13 @@ class StarList(object):
         :return:
         """
         partypes = []
+        seen = set()
 
         # go over each component and parameter
         for c in self._registered_components:
-            for p in list(self.componentList[c].keys()):
-                if p not in partypes:
+            for p in self.componentList[c]:
+                if p not in seen:
+                    seen.add(p)
                     partypes.append(p)
         return partypes
 
@@ -4099,12 +4133,9 @@ class StarList(object):
         :return:
         """
         pars = {x: [] for x in self._registered_components}
-        for key in list(kwargs.keys()):
+        for key, group in kwargs.items():
             for c in self._registered_components:
-                for i, par in enumerate(self.componentList[c][key]):
-                    # print i, par
-                    if par.group == kwargs[key]:
-                        pars[c].append(self.componentList[c][key][i])
+                pars[c].extend([par for par in self.componentList[c][key] if par.group == group])
 
         return pars
 
@@ -4113,11 +4144,13 @@ class StarList(object):
         Reads physical parameters from the starlist.
         :return:
         """
-        pars = []
+        pars = set()
         for c in self._registered_components:
-            pars.extend(list(self.componentList[c].keys()))
+            pars.update(self.componentList[c])
 
-        return np.unique(pars)
+        # sorted array as from np.unique, without sorting
+        # the names of every parameter of every component
+        return np.array(sorted(pars))
 
     def list_parameters(self):
         """
@@ -4136,74 +4169,64 @@ class StarList(object):
         :return:
         """
 
-        # read the file
-        lines = read_text_file(f)
-        data_start = len(lines)
-        for i, l in enumerate(lines):
-            if l.find('STARLIST') > -1:
-                data_start = i
-                break
-
-        # check that there are actually some data in the file
-        if data_start >= len(lines):
-            return False
-
         # create a StarList
         sl = StarList()
 
-        # from here the file is actually being read
-        for i, l in enumerate(lines[data_start+1:]):
-
-            # once we reach starlist again, we end
-            if l.find('STARLIST') > -1:
-                break
-            d = l.split()
-            if d[0].find('component') > -1:
-                cdict = {d[i].rstrip(':'): d[i+1] for i in range(0, len(d), 2)}
-
-                # cast the paramneters to teh correct types
-                for k in list(cdict.keys()):
-                    if k in ['value', 'vmin', 'vmax']:
-                        cdict[k] = float(cdict[k])
-                    elif k in ['group']:
-                        cdict[k] = int(cdict[k])
-                    elif k in ['fitted']:
-                        cdict[k] = string2bool(cdict[k])
+        # read the file line by line
+        with open(f, 'r') as ifile:
 
-                # add the parameter if it does not exist
-                c = cdict['component']
-                p = cdict['parameter']
-                if c not in list(sl.componentList.keys()):
-                    sl.componentList[c] = {}
-                    sl._registered_components.append(c)
-                if cdict['parameter'] not in list(sl.componentList[c].keys()):
-                    sl.componentList[c][p] = []
-
-                # transform the array to Parameter classs
-                pdict = {key: cdict[key] for key in list(cdict.keys()) if key not in ['parameter', 'component']}
-                pdict['name'] = p
-
-                # add the parameter to teh class
-                par = Parameter(**pdict)
-                sl.add_parameter_to_component(component=c, p=par)
+            # check that there are actually some data in the file
+            for l in ifile:
+                if 'STARLIST' in l:
+                    break
+            else:
+                return False
 
-            # do the same for enviromental keys
-            if d[0].find('env_keys') > -1:
-                # the first string is just identification
-                d = d[1:]
+            # from here the file is actually being read
+            for l in ifile:
 
-                # secure corrct types
-                recs = ['debug']
-                cast_types = [string2bool]
-                cdict = {d[i].rstrip(':'): d[i+1] for i in range(0, len(d), 2)}
-                for k in list(cdict.keys()):
-                    if k in recs:
-                        i = recs.index(k)
-                        ctype = cast_types[i]
-                        cdict[k] = ctype(cdict[k])
+                # once we reach starlist again, we end
+                if 'STARLIST' in l:
+                    break
+                d = l.split()
+                if d[0].find('component') > -1:
+                    # cast the paramneters to teh correct types
+                    pdict = {}
+                    for k, v in zip(d[::2], d[1::2]):
+                        k = k.rstrip(':')
+                        pdict[k] = _STARLIST_TYPES.get(k, str)(v)
+
+                    # add the parameter if it does not exist
+                    c = pdict.pop('component')
+                    p = pdict.pop('parameter')
+                    if c not in sl.componentList:
+                        sl.componentList[c] = {}
+                        sl._registered_components.append(c)
+
+                    # transform the array to Parameter classs
+                    # and add it to teh class - it is new, so
+                    # it does not have to be copied and the
+                    # groups are read once all are loaded
+                    pdict['name'] = p
+                    sl.componentList[c].setdefault(p, []).append(Parameter(**pdict))
+
+                # do the same for enviromental keys
+                if d[0].find('env_keys') > -1:
+                    # the first string is just identification
+                    d = d[1:]
+
+                    # secure corrct types
+                    for k, v in zip(d[::2], d[1::2]):
+                        k = k.rstrip(':')
+                        if k in _ENV_TYPES:
+                            v = _ENV_TYPES[k](v)
+
+                        # assign the vlues
+                        setattr(sl, k, v)
 
-                    # assign the vlues
-                    setattr(sl, k, cdict[k])
+        # readout the groups
+        sl.read_groups()
+        sl.get_fitted_types()
 
         # finally assign everything to self
         attrs = ['_registered_components', 'componentList', 'debug',
@@ -4222,12 +4245,22 @@ class StarList(object):
         :return:
         """
 
-        for component in list(self.componentList.keys()):
-            self.groups[component] = dict()
-            for key in list(self.componentList[component].keys()):
-                self.groups[component][key] = []
-                for par in self.componentList[component][key]:
-                    self.groups[component][key].append(par['group'])
+        # only the group attribute is read, so it is
+        # accessed directly and not through __getitem__
+        for component in self.componentList:
+            self.groups[component] = {key: [par.group for par in pars]
+                                      for key, pars in self.componentList[component].items()}
+
+    def _read_parameter_groups(self, component, parameter):
+        """
+        Does the same as read_groups for a single
+        parameter of a single component.
+        :param component
+        :param parameter
+        :return:
+        """
+        pars = self.componentList[component][parameter]
+        self.groups.setdefault(component, {})[parameter] = [par.group for par in pars]
 
     def remove_parameter(self, component, parameter, group):
         """
@@ -4238,6 +4271,7 @@ class StarList(object):
         """
         index = self.get_index(component, parameter, group)
         del self.componentList[component][parameter][index]
+        self._read_parameter_groups(component, parameter)
 
     def reset(self, parameters='all'):
         """
@@ -4248,9 +4282,10 @@ class StarList(object):
         # cycle over components
         for c in self._registered_components:
 
-            # select all parameters
+            # select all parameters - only values
+            # are replaced, so the keys can be iterated
             if parameters == 'all':
-                reset_params = list(self.componentList[c].keys())
+                reset_params = self.componentList[c]
             else:
                 reset_params = parameters
 
@@ -4271,26 +4306,22 @@ class StarList(object):
             ofile = open(ofile, 'w+')
 
         # parameters listed for each record in the starlist
-        listed_keys = ['value', 'unit', 'fitted', 'vmin', 'vmax', 'group']
-        string = ' STARLIST '.rjust(105, '#').ljust(200, '#') + '\n'
-        for c in list(self.componentList.keys()):
-            for key in list(self.componentList[c].keys()):
+        parts = [' STARLIST '.rjust(105, '#').ljust(200, '#') + '\n']
+        for c in self.componentList:
+            for key in self.componentList[c]:
                 for par in self.componentList[c][key]:
-                    string += 'component: %s ' % c
-                    string += 'parameter: %s ' % key
-                    for lkey in listed_keys:
-                        string += '%s: %s ' % (lkey, str(par[lkey]))
-                    string += '\n'
+                    values = tuple([str(getattr(par, lkey)) for lkey in _STARLIST_KEYS])
+                    parts.append(_STARLIST_LINE % ((c, key) + values))
 
         # setup additional parameters
         enviromental_keys = ['debug']
-        string += 'env_keys: '
+        parts.append('env_keys: ')
         for ekey in enviromental_keys:
-            string += '%s: %s ' % (ekey, str(getattr(self, ekey)))
-        string += '\n'
-        string += ' STARLIST '.rjust(105, '#').ljust(200, '#') + '\n'
+            parts.append('%s: %s ' % (ekey, str(getattr(self, ekey))))
+        parts.append('\n')
+        parts.append(' STARLIST '.rjust(105, '#').ljust(200, '#') + '\n')
         # write the remaining parameters
-        ofile.writelines(string)
+        ofile.write(''.join(parts))
 
     def set_groups(self, groups, overwrite=False):
         """
@@ -4311,41 +4342,39 @@ class StarList(object):
         :return: None
         """
 
-        for component in list(groups.keys()):
-            for parkey in list(groups[component].keys()):
+        for component in groups:
+
+            # setting group for all components
+            if component.lower() == 'all':
+                components = self._registered_components
+            # if we are setting group only for one component
+            else:
+                components = [component]
+
+            for parkey in groups[component]:
 
                 # bool variable for case, when we want to completely overwrite
                 # previous settings
                 first_in_list = True
 
+                # sets of already defined groups
+                defined = {one_comp: set(self.groups[one_comp][parkey]) for one_comp in components}
+
                 for group in groups[component][parkey]:
-                    # setting group for all components
-                    if component.lower() == 'all':
-                        for one_comp in self._registered_components:
-                            # print one_comp, parkey, self.groups
-                            if group not in self.groups[one_comp][parkey]:
-                                warnings.warn("Group %s: %s previously undefined."
-                                              "Adding to the remaining groups." % (parkey, str(group)))
-                                # print one_comp, parkey, group
-                                self.clone_parameter(one_comp, parkey, group=group)
-
-                                # deletes all previous groups
-                                if overwrite and first_in_list:
-                                    while len(self.groups[one_comp][parkey]) > 1:
-                                        del self.groups[one_comp][parkey][0]
-                                    first_in_list = False
-
-                    # if we are setting group only for one component
-                    else:
-                        if group not in self.groups[component][parkey]:
+                    for one_comp in components:
+                        # print one_comp, parkey, self.groups
+                        if group not in defined[one_comp]:
                             warnings.warn("Group %s: %s previously undefined."
                                           "Adding to the remaining groups." % (parkey, str(group)))
-                            self.clone_parameter(component, parkey, group=group)
+                            # print one_comp, parkey, group
+                            self.clone_parameter(one_comp, parkey, group=group)
+                            defined[one_comp].add(group)
 
                             # deletes all previous groups
                             if overwrite and first_in_list:
                                 while len(self.groups[one_comp][parkey]) > 1:
                                     del self.groups[one_comp][parkey][0]
+                                defined[one_comp] = set(self.groups[one_comp][parkey])
                                 first_in_list = False
 
     def set_parameter(self, name, component, group, **kwargs):
@@ -4370,14 +4399,15 @@ class StarList(object):
                             (group, component, name))
         else:
             for i, par in enumerate(self.componentList[component][name]):
-                if par['name'] == name and par['group'] == group:
-                    for key in list(kwargs.keys()):
+                if par.name == name and par.group == group:
+                    for key in kwargs:
                         keytest = key.lower()
                         # print name, component, keytest, kwargs[key]
                         self.componentList[component][name][i][keytest] = kwargs[key]
         # print self
-        # update the list of fitted types
-        self.get_fitted_types()
+        # update the list of fitted types, if it could change
+        if any(key.lower() == 'fitted' for key in kwargs):
+            self.get_fitted_types()
 
 
 class SyntheticList(List):
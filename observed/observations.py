@@ -42,6 +42,19 @@ class ObservedSpectrum:
         self.step = None
         self.npixel = None
 
+        # boundaries extended by the tolerance,
+        # within which the spectrum can be querried
+        self._wmin_tol = None
+        self._wmax_tol = None
+
+        # whether the wavelengths are sorted, it
+        # is checked when the spectrum is sliced
+        self._sorted = None
+
+        # spline representation of the spectrum, it
+        # is computed when the noise is estimated
+        self._tck = None
+
         # pass all arguments
         self.wave = wave
         self.intens = intens
@@ -62,9 +75,10 @@ class ObservedSpectrum:
             # check lengths of intens and wave
             self.check_length()
 
-            # set the error
+            # set the error - the global error is stored
+            # as a read-only view of the single value
             if isinstance(error, (float, int)) and error is not None:
-                self.error = np.ones(len(wave)) * error
+                self.error = np.broadcast_to(float(error), len(wave))
                 self.hasErrors = True
                 self.global_error = error
             elif error is not None:
@@ -145,6 +159,7 @@ class ObservedSpectrum:
         self.wave = None
         self.intens = None
         self.error = None
+        self._tck = None
         self.loaded = False
         self.hasErrors = False
 
@@ -197,7 +212,7 @@ class ObservedSpectrum:
         # save it as an error
         if store:
             self.global_error = stddev
-            self.error = stddev * np.ones(len(self.wave))
+            self.error = np.broadcast_to(float(stddev), len(self.wave))
 
         return stddev
 
@@ -214,25 +229,25 @@ class ObservedSpectrum:
         # get the linear scale
         lin_wave = np.linspace(self.wmin, self.wmax, self.npixel)
 
-        # interpolate to linear scale
-        tck = splrep(self.wave, self.intens)
-        lin_intens = splev(lin_wave, tck)
+        # interpolate to linear scale - the spline
+        # is kept, until the spectrum is changed
+        if self._tck is None:
+            self._tck = splrep(self.wave, self.intens)
+        lin_intens = splev(lin_wave, self._tck)
 
-        # perform the FFT and shift it
-        fft_intens = np.fft.fft(lin_intens)
+        # perform the FFT - the input is real, so
+        # only the non-negative frequencies are needed
+        fft_intens = np.fft.rfft(lin_intens)
 
-        # get absolute values
-        abs_fft_intens = np.absolute(fft_intens)
-
-        # get the high frequency tail
-        abs_fft_intens = abs_fft_intens[len(abs_fft_intens) / 2 - nlast + 1:len(abs_fft_intens) / 2 + nlast]
+        # get absolute values of the high frequency tail
+        abs_fft_intens = np.absolute(fft_intens[-nlast:])
 
         # estimate the error
         stddev = abs_fft_intens.std() * abs_fft_intens.mean()
 
         # store the value as an erro if needed
         if store:
-            self.error = stddev * np.ones(len(self.wave))
+            self.error = np.broadcast_to(float(stddev), len(self.wave))
             self.global_error = stddev
 
         return stddev
@@ -263,13 +278,20 @@ class ObservedSpectrum:
                     wmax = self.wmax
 
                 # What if we query too long spectrum
-                if (wmin-self.wmin) < -1e-6 or (wmax - self.wmax) > 1e-6:
+                if wmin < self._wmin_tol or wmax > self._wmax_tol:
                     raise ValueError("Querried spectral bounds (%f %f) lie outside "
                                      "observed spectrum bounds (%f %f)." %
                                      (wmin, wmax, self.wmin, self.wmax))
 
-                # selects the spectrum part
-                ind = np.where((self.wave >= wmin) & (self.wave <= wmax))[0]
+                # selects the spectrum part - sorted
+                # wavelengths are bisected
+                if self._sorted is None:
+                    self._sorted = bool(np.all(self.wave[1:] >= self.wave[:-1]))
+                if self._sorted:
+                    ind = slice(np.searchsorted(self.wave, wmin, side='left'),
+                                np.searchsorted(self.wave, wmax, side='right'))
+                else:
+                    ind = np.where((self.wave >= wmin) & (self.wave <= wmax))[0]
 
                 if self.error is not None:
                     return self.wave[ind].copy(), self.intens[ind].copy(), self.error[ind].copy()
@@ -329,14 +351,25 @@ class ObservedSpectrum:
         self.wmin = self.wave.min()
         self.wmax = self.wave.max()
         self.npixel = len(self.wave)
-        self.step = np.mean(self.wave[1:] - self.wave[:-1])
+        # the mean step - the differences sum
+        # up to the whole wavelength range
+        if self.npixel > 1:
+            self.step = (self.wave[-1] - self.wave[0]) / (self.npixel - 1)
+        else:
+            self.step = np.nan
+        self._wmin_tol = self.wmin - 1e-6
+        self._wmax_tol = self.wmax + 1e-6
+
+        # the wavelengths may have changed
+        self._sorted = None
 
     def read_spectrum_from_file(self, filename, global_error=None):
         """
         Reads the spectrum from a file. Following format
         is assumed: %f %f %f (wavelength, intensity, error).
         If user does not provide errors, we still attempt
-        to load teh spectrum.
+        to load teh spectrum. Files ending with .npy are
+        read as binary arrays with the same columns.
         :param filename spectrum source file
         :param global_error the error applicable to the spectrum
         :return None
@@ -346,13 +379,20 @@ class ObservedSpectrum:
         if global_error is None and self.global_error is not None:
             global_error = self.global_error
 
-        try:
-            # first we try to load 3 columns, i.e with errors
-            self.wave, self.intens, self.error = np.loadtxt(filename, unpack=True, usecols=[0, 1, 2])
+        # the file is parsed only once and
+        # the number of columns is checked
+        if filename.endswith('.npy'):
+            data = np.load(filename).T
+        else:
+            data = np.loadtxt(filename, unpack=True, ndmin=2)
+
+        if len(data) > 2:
+            # there are 3 columns, i.e with errors
+            self.wave, self.intens, self.error = data[0].copy(), data[1].copy(), data[2].copy()
             self.hasErrors = True
-        except:
-            # we failed, so we attempt to load two columns
-            self.wave, self.intens = np.loadtxt(filename, unpack=True, usecols=[0, 1])
+        else:
+            # there are only two columns
+            self.wave, self.intens = data[0].copy(), data[1].copy()
 
             # error was not set up
             if global_error is None:
@@ -363,12 +403,13 @@ class ObservedSpectrum:
 
             # error was set up
             else:
-                self.error = global_error * np.ones(len(self.wave))
+                self.error = np.broadcast_to(float(global_error), len(self.wave))
                 self.hasErrors = True
                 self.global_error = global_error
 
         # the spectrum is marked as loaded
         self.loaded = True
+        self._tck = None
 
         # the spectrum is checked
         self.check_length()
@@ -402,12 +443,14 @@ class ObservedSpectrum:
         if newlength >= self.npixel:
             return
 
-        # surviving spectra indices
-        inds = np.sort(np.random.randint(self.npixel, size=newlength))
+        # surviving spectra indices - each pixel
+        # can be selected only once
+        inds = np.sort(np.random.choice(self.npixel, size=newlength, replace=False))
 
         # adjustr the spectra
         self.wave = self.wave[inds]
         self.intens = self.intens[inds]
+        self._tck = None
         if self.error is not None:
             self.error = self.error[inds]
 
@@ -428,7 +471,7 @@ class ObservedSpectrum:
             self.hasErrors = True
             self.global_error = None
         if global_error is not None:
-            self.error = global_error * np.ones(len(self.wave))
+            self.error = np.broadcast_to(float(global_error), len(self.wave))
             self.hasErrors = True
             self.global_error = global_error
 
@@ -438,8 +481,8 @@ class ObservedSpectrum:
         :param group a dictionary of pairs parameter + group
         """
         # print group
-        for key in list(group.keys()):
-            self.group[key.lower()] = group[key]
+        for key, value in group.items():
+            self.group[key.lower()] = value
 
     def set_spectrum_from_arrays(self, wave, intens, error):
         """
@@ -452,6 +495,7 @@ class ObservedSpectrum:
         self.wave = wave
         self.intens = intens
         self.error = error
+        self._tck = None
         self.loaded = True
         self.hasErrors = True
 
@@ -0,0 +1,101 @@
+"""
+Test of the submodule ObservedList in fitting.
+Testing querying of spectra through the indices of
+properties and groups, spectra with lists of rv groups
+of different lengths and spectra shared by all components.
+"""
+import os
+import tempfile
+import warnings
+import numpy as np
+import pyterpol3
+
+# work in a scratch directory
+os.chdir(tempfile.mkdtemp())
+
+# observed spectra with different wavelength ranges
+for k, (wmin, wmax) in enumerate([(6500., 6600.), (6500., 6600.), (6520., 6580.), (6400., 6700.)]):
+    w = np.linspace(wmin, wmax, 501)
+    np.savetxt('o%d.asc' % k, np.column_stack([w, np.ones(len(w))]))
+
+# build a list of observations - rv groups are
+# lists of different lengths for some spectra
+obs = [
+    dict(filename='o0.asc', error=0.01, group=dict(rv=[3, 4], teff=0)),
+    dict(filename='o1.asc', error=0.01, group=dict(rv=5, teff=1)),
+    dict(filename='o2.asc', error=0.01, group=dict(rv=[6], teff=1)),
+    dict(filename='o3.asc', error=0.01, component='primary', korel=True, group=dict(rv=7, teff=0)),
+]
+ol = pyterpol3.ObservedList()
+ol.add_observations(obs)
+print(ol)
+
+
+def scan(ol, **kwargs):
+    """
+    Reference query going through all spectra.
+    """
+    found = []
+    for spectrum in ol.observedSpectraList['spectrum']:
+        ok = True
+        for key, value in kwargs.items():
+            if key == 'wmin':
+                ok &= spectrum.wmin <= value
+            elif key == 'wmax':
+                ok &= spectrum.wmax >= value
+            elif key == 'component':
+                ok &= spectrum.component in [value, 'all']
+            elif key in ['korel', 'filename']:
+                ok &= getattr(spectrum, key) == value
+            else:
+                groups = spectrum.group[key]
+                if not isinstance(groups, (list, tuple)):
+                    groups = [groups]
+                ok &= value in groups
+        if ok:
+            found.append(spectrum.filename)
+    return found
+
+# queries answered by the indices agree with a plain scan
+queries = [
+    dict(rv=4), dict(rv=5), dict(rv=6), dict(teff=1), dict(teff=0, rv=3),
+    dict(korel=True), dict(filename='o2.asc'), dict(wmin=6510.), dict(wmax=6590.),
+    dict(wmin=6450., wmax=6650.), dict(teff=1, wmin=6510., wmax=6590.),
+    dict(component='primary'), dict(component='all'), dict(component='primary', teff=0),
+]
+for q in queries:
+    found = [s.filename for s in ol.get_spectra(**q)]
+    print(q, found)
+    assert found == scan(ol, **q), q
+
+# spectra shared by all components are returned for any component
+found = [s.filename for s in ol.get_spectra(component='primary')]
+assert found == ['o0.asc', 'o1.asc', 'o2.asc', 'o3.asc'], found
+
+# the verbose output keeps the ragged rv groups
+osl = ol.get_spectra(verbose=True, rv=4)
+print(osl['group'])
+assert osl['group']['rv'] == [[3, 4]], osl['group']
+
+# a missing group is reported and nothing is returned
+# regardless of the order of the queries
+for q in [dict(rv=99), dict(korel=True, rv=99), dict(rv=3, teff=1)]:
+    with warnings.catch_warnings(record=True) as w:
+        warnings.simplefilter('always')
+        found = ol.get_spectra(**q)
+    print(q, found, len(w))
+    assert found == [], q
+    assert any('No spectrum matching' in str(x.message) for x in w), q
+
+# an empty match of a property is not reported
+with warnings.catch_warnings(record=True) as w:
+    warnings.simplefilter('always')
+    found = ol.get_spectra(filename='nonexistent.asc')
+assert found == []
+assert not any('No spectrum matching' in str(x.message) for x in w)
+
+# the indices follow changes of the groups
+ol.set_spectrum(filename='o1.asc', group=dict(rv=8))
+assert [s.filename for s in ol.get_spectra(rv=8)] == ['o1.asc']
+assert [s.filename for s in ol.get_spectra(rv=5, permissive=True)] == []
+print('OK')
@@ -0,0 +1,57 @@
+"""
+Test of the ObservedSpectrum class.
+Testing loading of ascii and binary .npy files
+with and without errors.
+"""
+import os
+import tempfile
+import warnings
+import numpy as np
+import pyterpol3
+
+# work in a scratch directory
+os.chdir(tempfile.mkdtemp())
+
+w = np.linspace(6500., 6600., 1001)
+i = 1. - 0.2 * np.exp(-(w - 6550.) ** 2 / 2.)
+e = 0.01 + 0.001 * np.sin(w)
+
+np.savetxt('two.asc', np.column_stack([w, i]))
+np.savetxt('three.asc', np.column_stack([w, i, e]))
+np.save('two.npy', np.column_stack([w, i]))
+np.save('three.npy', np.column_stack([w, i, e]))
+
+# three columns - errors are read from the file
+for f in ['three.asc', 'three.npy']:
+    obs = pyterpol3.ObservedSpectrum(filename=f)
+    ow, oi, oe = obs.get_spectrum()
+    print(f, obs.npixel, obs.hasErrors)
+    assert obs.hasErrors
+    assert np.allclose(ow, w) and np.allclose(oi, i) and np.allclose(oe, e)
+
+# two columns with a global error
+for f in ['two.asc', 'two.npy']:
+    obs = pyterpol3.ObservedSpectrum(filename=f, error=0.02)
+    ow, oi, oe = obs.get_spectrum()
+    print(f, obs.npixel, obs.hasErrors, obs.global_error)
+    assert obs.hasErrors
+    assert np.allclose(ow, w) and np.allclose(oi, i)
+    assert len(oe) == len(w) and np.all(oe == 0.02)
+
+    # the global error can be changed later
+    obs.set_error(global_error=0.03)
+    assert np.all(obs.get_spectrum()[2] == 0.03)
+
+# two columns without errors are loaded with a warning
+with warnings.catch_warnings(record=True) as warns:
+    warnings.simplefilter('always')
+    obs = pyterpol3.ObservedSpectrum(filename='two.npy')
+assert not obs.hasErrors
+assert len(warns) > 0
+
+# the binary and ascii files give the same spectrum
+a = pyterpol3.ObservedSpectrum(filename='three.asc')
+b = pyterpol3.ObservedSpectrum(filename='three.npy')
+assert (a.wmin, a.wmax, a.npixel) == (b.wmin, b.wmax, b.npixel)
+assert np.allclose(a.get_spectrum(6510., 6520.)[1], b.get_spectrum(6510., 6520.)[1])
+print('OK')
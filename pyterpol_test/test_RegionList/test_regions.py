@@ -0,0 +1,64 @@
+"""
+Test of the submodule RegionList in fitting.
+Testing regions read from more observed spectra and
+the look-up of regions by their boundaries.
+"""
+import os
+import tempfile
+import numpy as np
+import pyterpol3
+
+# work in a scratch directory
+os.chdir(tempfile.mkdtemp())
+
+# 1) regions from observed spectra
+limits = [(6500.2, 6599.8), (6500.4, 6599.9), (6510.5, 6580.5)]
+for k, (wmin, wmax) in enumerate(limits):
+    w = np.linspace(wmin, wmax, 501)
+    np.savetxt('o%d.asc' % k, np.column_stack([w, np.ones(len(w))]))
+obsl = [pyterpol3.ObservedSpectrum(filename='o%d.asc' % k, error=0.01) for k in range(len(limits))]
+
+# a single spectrum
+rl = pyterpol3.RegionList()
+rl.get_regions_from_obs(obsl[:1])
+print(rl)
+assert len(rl.get_registered_regions()) == 1
+assert rl.get_region(6501., 6599.) is not None
+
+# more spectra, two of them give the same region
+rl = pyterpol3.RegionList()
+limits = rl.get_regions_from_obs(obsl)
+print(rl)
+print(limits)
+assert list(limits['all'][0]) == [6501., 6511.]
+assert list(limits['all'][1]) == [6599., 6580.]
+assert len(rl.get_registered_regions()) == 2
+assert rl.get_region(6501., 6599.) is not None
+assert rl.get_region(6511., 6580.) is not None
+
+# an empty list is refused
+try:
+    rl.get_regions_from_obs([])
+    raise AssertionError('An empty list of spectra was accepted.')
+except ValueError as ex:
+    print(ex)
+
+# 2) regions are found by their boundaries
+rl = pyterpol3.RegionList()
+rl.add_region(identification='first', wmin=6500., wmax=6600.)
+rl.add_region(identification='second', component='primary', wmin=6520., wmax=6580.)
+rl.add_region(identification='third', component='secondary', wmin=6520., wmax=6580.)
+print(rl)
+assert rl.get_region(6500., 6600.) == 'first'
+assert rl.get_region(6520., 6580.) == 'second'
+assert rl.get_region(6520. + 1e-8, 6580.) == 'second'
+assert rl.get_region(6500., 6580.) is None
+
+# the look-up survives saving and loading
+rl.save('rl.sav')
+rl2 = pyterpol3.RegionList()
+rl2.load('rl.sav')
+print(rl2)
+assert rl2.get_region(6520., 6580.) == 'second'
+assert rl2.get_region(6500., 6600.) == 'first'
+print('OK')
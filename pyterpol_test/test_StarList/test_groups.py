@@ -0,0 +1,51 @@
+"""
+Test of the StarList class.
+Testing that the record on groups follows removal
+and deletion of parameters, so that set_groups adds
+groups that were removed before.
+"""
+import warnings
+import pyterpol3
+
+warnings.simplefilter('ignore')
+
+
+def parameter_groups(sl):
+    """
+    Groups of the parameters that are actually defined.
+    """
+    return {c: {key: [par.group for par in pars] for key, pars in d.items()}
+            for c, d in sl.componentList.items()}
+
+# 1) a removed group is defined again by set_groups
+sl = pyterpol3.StarList()
+sl.add_component(component='primary', teff=15000., logg=4.0, rv=0.)
+sl.clone_parameter('primary', 'rv', group=1)
+sl.remove_parameter('primary', 'rv', 0)
+assert sl.groups == parameter_groups(sl)
+
+# extending another parameter does not bring the removed group back
+sl.clone_parameter('primary', 'teff', group=1)
+assert sl.groups['primary']['rv'] == [1]
+
+sl.set_groups({'primary': {'rv': [0]}})
+print(sl)
+assert sl.groups['primary']['rv'] == [1, 0]
+assert parameter_groups(sl)['primary']['rv'] == [1, 0]
+
+# 2) deleted parameters are removed from the groups
+sl = pyterpol3.StarList()
+sl.add_component(component='primary', teff=15000., logg=4.0, rv=0.)
+sl.clone_parameter('primary', 'rv', group=1)
+sl.clone_parameter('primary', 'teff', group=2)
+sl.componentList['primary']['teff'][1].group = None
+sl.delete_hollow_groups()
+assert sl.groups == parameter_groups(sl)
+assert sl.groups['primary']['teff'] == [0]
+
+sl.add_parameter_to_component('primary', p=sl.componentList['primary']['rv'][1])
+assert sl.groups['primary']['rv'] == [0, 1, 1]
+sl.delete_duplicities()
+print(sl)
+assert sl.groups == parameter_groups(sl)
+print('OK')
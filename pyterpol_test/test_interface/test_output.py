@@ -0,0 +1,152 @@
+"""
+Testing the setup of groups in the Interface and writing
+of the synthetic and shifted spectra, both in ascii and
+binary .npy files. The grids are not distributed with
+the package, so a small grid is written to disk and
+passed to the Interface through a custom SyntheticGrid.
+"""
+import os
+import glob
+import tempfile
+import warnings
+import numpy as np
+import pyterpol3
+import pyterpol3.fitting.interface as interface
+
+warnings.simplefilter('ignore')
+
+# work in a scratch directory
+os.chdir(tempfile.mkdtemp())
+
+# 1) a small grid of synthetic spectra
+os.mkdir('grid')
+w = np.arange(6400., 6700., 0.01)
+with open('grid/gridlist', 'w') as ofile:
+    for teff in [10000., 15000., 20000.]:
+        for logg in [3.5, 4.0, 4.5]:
+            name = 'T%05dg%02d.dat' % (teff, logg * 10)
+            depth = 0.2 + 0.3 * (teff - 10000.) / 10000. + 0.05 * (logg - 4.)
+            np.savetxt(os.path.join('grid', name),
+                       np.column_stack([w, 1. - depth * np.exp(-(w - 6550.) ** 2 / 2.)]))
+            ofile.write('%s %.1f %.2f %.2f\n' % (name, teff, logg, 1.0))
+
+
+class LocalGrid(pyterpol3.SyntheticGrid):
+    """
+    The grid written above, whatever mode is asked for.
+    """
+    def __init__(self, mode='default', flux_type='relative', debug=False):
+        pyterpol3.SyntheticGrid.__init__(self, mode='custom', debug=debug)
+        self.read_list_from_file('grid/gridlist', ['FILENAME', 'TEFF', 'LOGG', 'Z'],
+                                 family='LOCAL', directory='grid')
+        self.set_grid_order(['LOCAL'])
+
+interface.SyntheticGrid = LocalGrid
+
+# 2) observed spectra
+for k in range(3):
+    i = 1. - 0.3 * np.exp(-(w - 6550. - k) ** 2 / 2.)
+    np.savetxt('o%d.asc' % k, np.column_stack([w, i])[(w > 6500.) & (w < 6600.)])
+
+
+def setup_interface(obs, **kwargs):
+    """
+    Builds the Interface for the given observations.
+    """
+    sl = pyterpol3.StarList()
+    sl.add_component(component='primary', teff=15000., logg=4.0, vrot=10., rv=-20., lr=0.6, z=1.0)
+    sl.add_component(component='secondary', teff=12000., logg=4.0, vrot=10., rv=20., lr=0.4, z=1.0)
+    rl = pyterpol3.RegionList()
+    rl.add_region(wmin=6510., wmax=6590.)
+    rl.add_region(wmin=6530., wmax=6570., groups=dict(lr=1))
+    ol = pyterpol3.ObservedList()
+    ol.add_observations(obs)
+    itf = pyterpol3.Interface(sl=sl, rl=rl, ol=ol, **kwargs)
+    itf.set_grid_properties(order=2, step=0.05)
+    itf.setup()
+    return itf
+
+# 3) a spectrum without the rv group gets the least
+# free one in each region
+itf = setup_interface([dict(filename='o0.asc', error=0.01)])
+print(itf)
+print(itf.rel_rvgroup_region)
+assert itf.rel_rvgroup_region == {'region00': [1], 'region01': [2]}
+assert itf.ol.get_spectra()[0].group['rv'] == [1, 2]
+assert itf.sl.get_defined_groups(component='all', parameter='rv')['all']['rv'] == [1, 2]
+
+# 4) user-defined rv groups
+obs = [
+    dict(filename='o0.asc', error=0.01, group=dict(rv=1)),
+    dict(filename='o1.asc', error=0.01, group=dict(rv=2)),
+    dict(filename='o2.asc', error=0.01, group=dict(rv=[1, 2])),
+]
+itf = setup_interface(obs)
+print(itf.rel_rvgroup_region)
+assert itf.rel_rvgroup_region == {'region00': [1, 2], 'region01': [1, 2]}
+assert itf.sl.get_defined_groups(component='all', parameter='rv')['all']['rv'] == [1, 2]
+itf.set_parameter(parname='rv', component='primary', group=2, value=-50.)
+chi2 = itf.compute_chi2()
+print(chi2)
+assert np.isfinite(chi2)
+
+# 5) synthetic spectra of all rv groups
+itf.write_synthetic_spectra(outputname='all')
+names = sorted(glob.glob('all_*.dat'))
+print(names)
+assert len(names) == 8
+
+# the spectra of each rv group do not depend on the
+# other groups written with them
+for rvg in [1, 2]:
+    itf.write_synthetic_spectra(outputname='one', rvgroups=rvg)
+    itf.write_synthetic_spectra(outputname='list', rvgroups=[rvg])
+    for c in ['primary', 'secondary']:
+        for wmin, wmax in [(6510., 6590.), (6530., 6570.)]:
+            suffix = '_'.join(['c', c, 'r', str(wmin), str(wmax), 'g', str(rvg)]) + '.dat'
+            a = np.loadtxt('all_' + suffix)
+            assert np.array_equal(a, np.loadtxt('one_' + suffix)), suffix
+            assert np.array_equal(a, np.loadtxt('list_' + suffix)), suffix
+
+# the rv of the group is applied
+a = np.loadtxt('all_c_primary_r_6510.0_6590.0_g_1.dat')
+b = np.loadtxt('all_c_primary_r_6510.0_6590.0_g_2.dat')
+assert not np.allclose(a[:, 1], b[:, 1])
+
+# writing again gives the same spectra
+itf.write_synthetic_spectra(outputname='again')
+for name in names:
+    assert np.array_equal(np.loadtxt(name), np.loadtxt(name.replace('all_', 'again_', 1))), name
+
+# 6) binary output holds the same data as the ascii one
+itf.write_synthetic_spectra(outputname='all', binary=True)
+for name in names:
+    a = np.loadtxt(name)
+    b = np.load(name[:-4] + '.npy')
+    assert a.shape == b.shape
+    assert np.allclose(a, b, rtol=1e-7, atol=0.), name
+
+itf.write_shifted_spectra(outputfile='sh')
+itf.write_shifted_spectra(outputfile='sh', binary=True)
+names = sorted(glob.glob('sh_*.dat'))
+print(names)
+assert len(names) > 0
+assert len(names) == len(glob.glob('sh_*.npy'))
+for name in names:
+    b = np.load(name[:-4] + '.npy')
+    assert np.allclose(np.loadtxt(name), b, rtol=1e-7, atol=0.), name
+
+    # the binary output can be read as an observed spectrum
+    obs = pyterpol3.ObservedSpectrum(filename=name[:-4] + '.npy', error=0.01)
+    assert np.array_equal(obs.get_spectrum()[0], b[:, 0])
+
+# 7) one group of a parameter for each spectrum
+itf = setup_interface(obs=[dict(filename='o0.asc', error=0.01, group=dict(rv=1)),
+                           dict(filename='o1.asc', error=0.01, group=dict(rv=2))],
+                      spectrum_by_spectrum=['teff'])
+print(itf.sl)
+teffs = itf.sl.get_defined_groups(component='primary', parameter='teff')['primary']['teff']
+print(teffs)
+assert len(teffs) == 2
+assert np.isfinite(itf.compute_chi2())
+print('OK')
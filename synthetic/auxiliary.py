@@ -399,14 +399,33 @@ def string2bool(s):
         return False
 
 
-def write_numpy(f, cols, fmt):
+def write_numpy(f, cols, fmt, header=''):
     """
     An example of lack of brain of the main developer of this "code".
 
+    The whole block is formatted at once and written
+    with a single call, instead of row by row as savetxt
+    does. The output is the same. Formatting the columns
+    with np.char.mod and joining them is about three
+    times slower than the single % on the whole block.
+
     :param f: outputfile or handler
     :param cols: block of data to be writte
     :param fmt: format of the blocs
+    :param header: string written before the block
     :return: None
     """
+    cols = np.asarray(cols)
+    if cols.ndim == 1:
+        cols = cols[:, np.newaxis]
+
+    # format of one row
+    nrow, ncol = cols.shape
+    row = ' '.join([fmt] * ncol) + '\n'
+    block = header + (row * nrow) % tuple(cols.ravel().tolist())
 
-    np.savetxt(f, cols, fmt=fmt)
+    if isinstance(f, str):
+        with open(f, 'w') as ofile:
+            ofile.write(block)
+    else:
+        f.write(block)
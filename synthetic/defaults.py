@@ -1,48 +1,51 @@
 # defaults settings - for more utility, this was transfered
 # to init
-import os, inspect
+import os
 
-curdir = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
+curdir = os.path.dirname(os.path.abspath(__file__))
+
+# column layout of the gridlist files, shared by all grids
+_STD_COLS = ('FILENAME', 'TEFF', 'LOGG', 'Z')
 
 # DEFINITIONS OF GRIDS OF RELATIVE SPECTRA
 # ----------------------------------------------------------------------------------------------------------------------
-gridDirectory = os.path.join("/".join(curdir.split('/')[:-1]), 'grids')
+gridDirectory = os.path.join(os.path.dirname(curdir), 'grids')
 # name of the file containing records on synthetic spectra
 gridListFile = 'gridlist'
 
+# mode -> record of directories, columns and families
 grid_files = dict(
-    identification=[
-        'DEFAULT',
-        'OSTAR',
-        'BSTAR',
-        'POLLUX',
-        'AMBRE',
-        'POWR',
-        ],
-    directories=[
-        ['OSTAR_Z_0.5', 'OSTAR_Z_1.0', 'OSTAR_Z_2.0', 'BSTAR_Z_0.5', 'BSTAR_Z_1.0', 'BSTAR_Z_2.0', 'POLLUX_Z_1.0', 'AMBRE_Z_1.0'],
-        ['OSTAR_Z_0.5', 'OSTAR_Z_1.0', 'OSTAR_Z_2.0'],
-        ['BSTAR_Z_0.5', 'BSTAR_Z_1.0', 'BSTAR_Z_2.0'],
-        ['POLLUX_Z_1.0'],
-        ['AMBRE_Z_1.0'],
-        ['POWR_Z_1.0'],
-        ],
-    columns=[
-        ['FILENAME', 'TEFF', 'LOGG', 'Z'],
-        ['FILENAME', 'TEFF', 'LOGG', 'Z'],
-        ['FILENAME', 'TEFF', 'LOGG', 'Z'],
-        ['FILENAME', 'TEFF', 'LOGG', 'Z'],
-        ['FILENAME', 'TEFF', 'LOGG', 'Z'],
-        ['FILENAME', 'TEFF', 'LOGG', 'Z'],
-        ],
-    families=[
-        ['OSTAR', 'OSTAR', 'OSTAR', 'BSTAR', 'BSTAR', 'BSTAR', 'POLLUX', 'AMBRE'],
-        ['OSTAR', 'OSTAR', 'OSTAR'],
-        ['BSTAR', 'BSTAR', 'BSTAR'],
-        ['POLLUX'],
-        ['AMBRE'],
-        ['POWR'],
-        ]
+    DEFAULT=dict(
+        directories=['OSTAR_Z_0.5', 'OSTAR_Z_1.0', 'OSTAR_Z_2.0', 'BSTAR_Z_0.5', 'BSTAR_Z_1.0', 'BSTAR_Z_2.0',
+                     'POLLUX_Z_1.0', 'AMBRE_Z_1.0'],
+        columns=_STD_COLS,
+        families=['OSTAR', 'OSTAR', 'OSTAR', 'BSTAR', 'BSTAR', 'BSTAR', 'POLLUX', 'AMBRE'],
+        ),
+    OSTAR=dict(
+        directories=['OSTAR_Z_0.5', 'OSTAR_Z_1.0', 'OSTAR_Z_2.0'],
+        columns=_STD_COLS,
+        families=['OSTAR', 'OSTAR', 'OSTAR'],
+        ),
+    BSTAR=dict(
+        directories=['BSTAR_Z_0.5', 'BSTAR_Z_1.0', 'BSTAR_Z_2.0'],
+        columns=_STD_COLS,
+        families=['BSTAR', 'BSTAR', 'BSTAR'],
+        ),
+    POLLUX=dict(
+        directories=['POLLUX_Z_1.0'],
+        columns=_STD_COLS,
+        families=['POLLUX'],
+        ),
+    AMBRE=dict(
+        directories=['AMBRE_Z_1.0'],
+        columns=_STD_COLS,
+        families=['AMBRE'],
+        ),
+    POWR=dict(
+        directories=['POWR_Z_1.0'],
+        columns=_STD_COLS,
+        families=['POWR'],
+        ),
 )
 
 # stores default grid order
@@ -50,36 +53,32 @@ default_grid_order = ['BSTAR', 'OSTAR', 'AMBRE', 'POLLUX']
 
 # DEFINITIONS OF GRIDS OF ABSOLUTE SPECTRA
 # ----------------------------------------------------------------------------------------------------------------------
-ABS_gridDirectory = os.path.join("/".join(curdir.split('/')[:-1]), 'grids_ABS')
+ABS_gridDirectory = os.path.join(os.path.dirname(curdir), 'grids_ABS')
 # name of the file containing records on synthetic spectra
 ABS_gridListFile = 'gridlist'
 
 # POLLUX has a too narrow wavelength range => it was deleted from default
 ABS_grid_files = dict(
-    identification=[
-        'DEFAULT',
-        'POLLUX',
-        'BSTAR',
-        'PHOENIX',
-        ],
-    directories=[
-        ['OSTAR_Z_1.0', 'BSTAR_Z_1.0', 'PHOENIX_Z_1.0'],
-        ['OSTAR_Z_1.0', 'BSTAR_Z_1.0', 'PHOENIX_Z_1.0', 'POLLUX_Z_1.0'],
-        ['BSTAR_Z_1.0'],
-        ['PHOENIX_Z_1.0'],
-        ],
-    columns=[
-        ['FILENAME', 'TEFF', 'LOGG', 'Z'],
-        ['FILENAME', 'TEFF', 'LOGG', 'Z'],
-        ['FILENAME', 'TEFF', 'LOGG', 'Z'],
-        ['FILENAME', 'TEFF', 'LOGG', 'Z'],
-        ],
-    families=[
-        ['OSTAR', 'BSTAR', 'PHOENIX'],
-        ['OSTAR', 'BSTAR', 'PHOENIX', 'POLLUX'],
-        ['BSTAR'],
-        ['PHOENIX'],
-        ]
+    DEFAULT=dict(
+        directories=['OSTAR_Z_1.0', 'BSTAR_Z_1.0', 'PHOENIX_Z_1.0'],
+        columns=_STD_COLS,
+        families=['OSTAR', 'BSTAR', 'PHOENIX'],
+        ),
+    POLLUX=dict(
+        directories=['OSTAR_Z_1.0', 'BSTAR_Z_1.0', 'PHOENIX_Z_1.0', 'POLLUX_Z_1.0'],
+        columns=_STD_COLS,
+        families=['OSTAR', 'BSTAR', 'PHOENIX', 'POLLUX'],
+        ),
+    BSTAR=dict(
+        directories=['BSTAR_Z_1.0'],
+        columns=_STD_COLS,
+        families=['BSTAR'],
+        ),
+    PHOENIX=dict(
+        directories=['PHOENIX_Z_1.0'],
+        columns=_STD_COLS,
+        families=['PHOENIX'],
+        ),
 )
 
 # stores default grid order
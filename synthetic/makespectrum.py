@@ -517,8 +517,10 @@ class SyntheticGrid:
         self.parameterList = []
         self.columns = []
 
-        # grid preference order
+        # grid preference order and rank of each grid in it
         self.gridOrder = None
+        self._gridRank = None
+        self._rankedOrder = None
 
         # reads default grids
         if mode.lower() != 'custom':
@@ -892,12 +894,12 @@ class SyntheticGrid:
         """
         # go over differents modes
         string = 'List of registered modes and their properties follows:\n'
-        for i in range(0, len(self.grid_files['identification'])):
+        for mode, rec in grid_files.items():
             string += ''.ljust(100,'=') + '\n'
-            string += 'mode: %s:\n' % self.grid_files['identification'][i]
-            string += 'directories: %s \n' % str(self.grid_files['directories'][i])
-            string += 'columns: %s\n' % str(self.grid_files['columns'][i])
-            string += 'families: %s\n' % str(self.grid_files['families'][i])
+            string += 'mode: %s:\n' % mode
+            string += 'directories: %s \n' % str(rec['directories'])
+            string += 'columns: %s\n' % str(rec['columns'])
+            string += 'families: %s\n' % str(rec['families'])
         string += ''.ljust(100,'=') + '\n'
 
         return string
@@ -1050,14 +1052,16 @@ class SyntheticGrid:
                            ' I think it is because we have more grids, that overlap.'
                            ' You can overcome this by setting gridOrder variable.')
 
-        indices = []
-        for i in range(0, len(speclist)):
-            # print speclist[i]['family']
-            indices.append(self.gridOrder.index(speclist[i]['family']))
+        # gridOrder may have been assigned or edited directly
+        if tuple(self.gridOrder) != self._rankedOrder:
+            self.set_grid_order(self.gridOrder)
+
+        # unknown grids are the least preferred
+        nrank = len(self._rankedOrder)
+        indices = np.array([self._gridRank.get(spec['family'], nrank) for spec in speclist])
 
         # just in case there was something peculiar
-        indices = np.array(indices)
-        if np.any(indices < -1):
+        if np.any(indices == nrank):
             warnings.warn('At least one grid was not found in the gridOrder variable.'
                           ' Verify that the names set in gridOrder agree with family names of spectra.')
 
@@ -1249,14 +1253,13 @@ class SyntheticGrid:
             self.default_grid_order = ABS_default_grid_order
 
         # select properties
-        ind = self.grid_files['identification'].index(mode)
-
-        if ind < 0:
+        if mode not in self.grid_files:
             raise ValueError('Default settings named %s not found.' % (mode))
 
-        dirs = self.grid_files['directories'][ind]
-        cols = self.grid_files['columns'][ind]
-        fams = self.grid_files['families'][ind]
+        rec = self.grid_files[mode]
+        dirs = rec['directories']
+        cols = rec['columns']
+        fams = rec['families']
 
         # reads the grid files
         for i, d in enumerate(dirs):
@@ -1286,6 +1289,12 @@ class SyntheticGrid:
 
         self.gridOrder = arr
 
+        # the first occurrence of a grid gives its rank
+        self._gridRank = {}
+        for i, fam in enumerate(arr):
+            self._gridRank.setdefault(fam, i)
+        self._rankedOrder = tuple(arr)
+
     def set_wavelength_vector(self, wmin, wmax, step):
         """
         Store the wavelength vector within the class.